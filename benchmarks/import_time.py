@@ -0,0 +1,76 @@
+"""
+Checks the cold-start import time of tbwk against a recorded budget.
+
+Runs `python -X importtime -c "import <module>"` several times in fresh interpreters and reports the best
+cumulative import time of the module. Exits with a non-zero status if the budget is exceeded or if one of
+the lazily loaded dependencies is imported eagerly.
+
+Usage:
+    python benchmarks/import_time.py [--budget-ms 250] [--repeat 5] [--module tbwk.Worksheet]
+"""
+import argparse
+import subprocess
+import sys
+
+
+# Recorded budget in milliseconds. numpy accounts for most of it; scipy alone used to add ~700 ms.
+IMPORT_BUDGET_MS = 250
+
+# Modules that must only be imported on demand.
+LAZY_MODULES = ("scipy", "defusedxml", "xml.etree")
+
+
+def measure(module: str) -> int:
+    """ Returns the cumulative import time of module in microseconds. """
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True, check=True,
+    )
+
+    for line in process.stderr.splitlines():
+        parts = [part.strip() for part in line.split("|")]
+
+        if len(parts) == 3 and parts[2] == module:
+            return int(parts[1])
+
+    raise RuntimeError(f"Import time of {module} not found in output.")
+
+
+def eager_imports(module: str) -> list:
+    """ Returns the lazily loaded modules that are imported by module anyway. """
+    code = (
+        f"import sys, {module}\n"
+        f"print(','.join(m for m in {LAZY_MODULES!r} if m in sys.modules))"
+    )
+    process = subprocess.run([sys.executable, "-c", code], stdout=subprocess.PIPE, universal_newlines=True,
+                             check=True)
+
+    return [name for name in process.stdout.strip().split(",") if name]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--budget-ms", type=float, default=IMPORT_BUDGET_MS)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--module", default="tbwk.Worksheet")
+    args = parser.parse_args()
+
+    best = min(measure(args.module) for _ in range(args.repeat)) / 1000
+    print(f"import {args.module}: {best:.1f} ms (budget {args.budget_ms:.1f} ms)")
+
+    status = 0
+
+    if best > args.budget_ms:
+        print("Import time budget exceeded.")
+        status = 1
+
+    eager = eager_imports(args.module)
+    if eager:
+        print(f"Eagerly imported: {', '.join(eager)}")
+        status = 1
+
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
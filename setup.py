@@ -24,6 +24,11 @@ setuptools.setup(
         "Topic :: Utilities",
     ],
     python_requires='>=3.6',
+    entry_points={
+        "console_scripts": [
+            "tbwk=tbwk.__main__:main",
+        ],
+    },
     install_requires=[
         "numpy",
         "scipy",
@@ -0,0 +1,127 @@
+import fnmatch
+import gzip
+import os
+import tarfile
+import zipfile
+from typing import Collection, Iterator, List, Optional, Tuple
+
+from tbwk.Worksheet import Worksheet, import_worksheet
+
+
+"""
+Reading worksheets directly from zip, tar (optionally compressed) and gzip archives.
+
+Archive members are never extracted to disk. Each member is opened as a decompressing stream and fed into
+the block parser, so only the block currently being parsed is held in memory.
+"""
+
+
+PATTERN = "*.twbk"
+
+
+def _is_gzip(filename: str) -> bool:
+    with open(filename, "rb") as fh:
+        return fh.read(2) == b"\x1f\x8b"
+
+
+def _gzip_member_name(filename: str) -> str:
+    name = os.path.basename(filename)
+    return name[:-3] if name.lower().endswith(".gz") else name
+
+
+def list_archive(filename: str, pattern: str = PATTERN) -> List[str]:
+    """
+    Returns the names of all worksheet members of an archive.
+
+    :param filename: Path to a zip, tar or gzip archive
+    :param pattern: Glob pattern the member names must match
+    :return:
+    """
+    if zipfile.is_zipfile(filename):
+        with zipfile.ZipFile(filename) as archive:
+            names = [info.filename for info in archive.infolist() if not info.is_dir()]
+    elif tarfile.is_tarfile(filename):
+        with tarfile.open(filename, "r|*") as archive:
+            names = [member.name for member in archive if member.isfile()]
+    elif _is_gzip(filename):
+        names = [_gzip_member_name(filename)]
+    else:
+        raise ValueError(f"File {filename} is not a supported archive.")
+
+    return [name for name in names if fnmatch.fnmatch(os.path.basename(name), pattern)]
+
+
+def iter_archive(filename: str,
+                 pattern: str = PATTERN,
+                 skip_hashes: Optional[Collection[bytes]] = None,
+                 ) -> Iterator[Tuple[str, Worksheet]]:
+    """
+    Iterates over all worksheets within an archive.
+
+    Tar archives are read sequentially in a single pass, which also works for compressed tar files.
+
+    :param filename: Path to a zip, tar or gzip archive
+    :param pattern: Glob pattern the member names must match
+    :param skip_hashes: Content hashes of measurements that should not be imported, see import_worksheet
+    :return: Tuples of member name and worksheet
+    """
+    if zipfile.is_zipfile(filename):
+        with zipfile.ZipFile(filename) as archive:
+            for info in archive.infolist():
+                if info.is_dir() or not fnmatch.fnmatch(os.path.basename(info.filename), pattern):
+                    continue
+
+                with archive.open(info) as fh:
+                    yield info.filename, import_worksheet(fh, skip_hashes)
+    elif tarfile.is_tarfile(filename):
+        with tarfile.open(filename, "r|*") as archive:
+            for member in archive:
+                if not member.isfile() or not fnmatch.fnmatch(os.path.basename(member.name), pattern):
+                    continue
+
+                with archive.extractfile(member) as fh:
+                    yield member.name, import_worksheet(fh, skip_hashes)
+    elif _is_gzip(filename):
+        name = _gzip_member_name(filename)
+
+        if fnmatch.fnmatch(name, pattern):
+            with gzip.open(filename, "rb") as fh:
+                yield name, import_worksheet(fh, skip_hashes)
+    else:
+        raise ValueError(f"File {filename} is not a supported archive.")
+
+
+def import_from_archive(filename: str,
+                        member: str,
+                        skip_hashes: Optional[Collection[bytes]] = None,
+                        ) -> Worksheet:
+    """
+    Imports a single worksheet from an archive.
+
+    :param filename: Path to a zip, tar or gzip archive
+    :param member: Name of the worksheet within the archive. Ignored for gzip files, which contain one file only.
+    :param skip_hashes: Content hashes of measurements that should not be imported, see import_worksheet
+    :return:
+    """
+    if zipfile.is_zipfile(filename):
+        with zipfile.ZipFile(filename) as archive:
+            try:
+                info = archive.getinfo(member)
+            except KeyError:
+                raise FileNotFoundError(f"Member {member} was not found in {filename}.")
+
+            with archive.open(info) as fh:
+                return import_worksheet(fh, skip_hashes)
+    elif tarfile.is_tarfile(filename):
+        with tarfile.open(filename, "r|*") as archive:
+            for info in archive:
+                if info.name == member and info.isfile():
+                    with archive.extractfile(info) as fh:
+                        return import_worksheet(fh, skip_hashes)
+
+        raise FileNotFoundError(f"Member {member} was not found in {filename}.")
+    elif _is_gzip(filename):
+        with gzip.open(filename, "rb") as fh:
+            return import_worksheet(fh, skip_hashes)
+    else:
+        raise ValueError(f"File {filename} is not a supported archive.")
@@ -0,0 +1,232 @@
+import io
+import numpy as np
+from typing import List, Tuple, Union
+
+from tbwk.RawOpener import Block, iter_block_headers
+from tbwk.Worksheet import read_content
+
+
+"""
+Bulk decoding of the fixed-layout parts of all measurements within a file.
+
+Instead of parsing each block with repeated slicing and int.from_bytes, the offsets of all measurement (151)
+blocks are collected once, and the nested blocks are then located for all measurements at the same time: each
+step reads one block header per measurement with a single gather from the file buffer. Timestamps, labels and
+vector headers are read with numpy structured dtypes the same way.
+
+Within a measurement block, the decoder expects the layout that Measurement.from_block relies on:
+
+    151
+        152             title
+        920
+            930
+                931     timestamp (last 8 bytes, windows file time)
+                932     y values
+                932     x values
+"""
+
+
+BLOCK_HEADER = np.dtype([("type", "<u4"), ("size", "<u4"), ("reserved", "<u4")])
+
+# The part of a 932 block between the axis labels and the values.
+VECTOR_HEADER = np.dtype([
+    ("reserved", "V8"),
+    ("dimension", "<i4"),
+    ("flag", "u1"),
+    ("scale", "<f8"),
+    ("offset", "<f8"),
+    ("count", "<i4"),
+])
+
+# Windows file time of 1970-01-01 00:00:00 UTC, in 100 ns.
+FILETIME_UNIX_EPOCH = 116444736000000000
+
+# Offset of the labels within a 932 block, counted from the start of the block content.
+VECTOR_LABEL_OFFSET = 59
+
+
+def gather(buffer: np.ndarray, positions: np.ndarray, dtype: Union[np.dtype, str]) -> np.ndarray:
+    """
+    Reads one item of a fixed-size dtype at each of the given byte positions.
+
+    :param buffer: uint8 view of the file content
+    :param positions: Byte positions, shape (n,)
+    :param dtype: dtype of the items
+    :return: Array of shape (n,)
+    """
+    dtype = np.dtype(dtype)
+    indices = np.asarray(positions, dtype=np.int64)[:, None] + np.arange(dtype.itemsize)
+
+    return buffer[indices].view(dtype).reshape(-1)
+
+
+def gather_strings(buffer: np.ndarray, positions: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Reads one length-prefixed string (1 byte length, n bytes) at each of the given byte positions.
+
+    :param buffer: uint8 view of the file content
+    :param positions: Byte positions of the length bytes, shape (n,)
+    :return: Lengths as int64 and the strings as a fixed-width bytes array
+    """
+    positions = np.asarray(positions, dtype=np.int64)
+    lengths = buffer[positions].astype(np.int64)
+    width = max(int(lengths.max(initial=0)), 1)
+
+    columns = np.arange(width)
+    indices = np.minimum(positions[:, None] + 1 + columns, len(buffer) - 1)
+
+    characters = buffer[indices]
+    characters[columns >= lengths[:, None]] = 0
+
+    return lengths, characters.view(f"S{width}").reshape(-1)
+
+
+def filetime_to_datetime64(filetime: np.ndarray) -> np.ndarray:
+    """
+    Converts windows file times (100 ns since January 1, 1601 UTC) to exact datetime64[ns] values in UTC.
+    """
+    return ((filetime.astype(np.int64) - FILETIME_UNIX_EPOCH) * 100).astype("datetime64[ns]")
+
+
+def _children(buffer: np.ndarray, positions: np.ndarray, index: int, expected_type: int) -> np.ndarray:
+    """ Returns the positions of the index-th block within the subfile of each block at positions. """
+    # The subfile starts after the block header and 12 further bytes.
+    start = positions + 24
+    header_size = gather(buffer, start + 32, "<u4").astype(np.int64)
+    child = start + 40 + header_size
+
+    for _ in range(index):
+        child = child + 12 + gather(buffer, child, BLOCK_HEADER)["size"].astype(np.int64)
+
+    types = gather(buffer, child, BLOCK_HEADER)["type"]
+
+    if np.any(types != expected_type):
+        raise ValueError(f"Unexpected block layout: block {index} of a subfile is not of type {expected_type}.")
+
+    return child
+
+
+def find_measurement_blocks(content) -> np.ndarray:
+    """ Returns the offsets of all top-level measurement (151) blocks within a file. """
+    return np.array(
+        [offset for block_type, block_size, offset in iter_block_headers(content) if block_type == Block.Measurement],
+        dtype=np.int64,
+    )
+
+
+def _decode_vectors(buffer: np.ndarray, positions: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """ Returns long label, short label, value count and value offset of each 932 block at positions. """
+    label_position = positions + 12 + VECTOR_LABEL_OFFSET
+    long_length, long_labels = gather_strings(buffer, label_position)
+
+    short_position = label_position + 1 + long_length
+    short_length, short_labels = gather_strings(buffer, short_position)
+
+    header_position = short_position + 1 + short_length
+    counts = gather(buffer, header_position, VECTOR_HEADER)["count"]
+
+    return long_labels, short_labels, counts, header_position + VECTOR_HEADER.itemsize
+
+
+def decode_measurements(content: Union[bytes, bytearray, memoryview]) -> np.ndarray:
+    """
+    Decodes title, timestamp, axis labels and vector headers of all measurements within a file in bulk.
+
+    :param content: Content of a tbwk file
+    :return: A structured array with one row per measurement and the fields
+        offset (of the 151 block), title, time (datetime64[ns], UTC), y_label, y_label_short, y_count,
+        y_offset (byte offset of the y values), and the same four fields for x.
+    """
+    buffer = np.frombuffer(content, dtype=np.uint8)
+    offsets = find_measurement_blocks(content)
+
+    # Measurement blocks -> 152 (title) and 920 -> 930 -> 931 (time), 932 (y), 932 (x)
+    title_blocks = _children(buffer, offsets, 0, 152)
+    vector_blocks = _children(buffer, _children(buffer, offsets, 1, 920), 2, 930)
+    time_blocks = _children(buffer, vector_blocks, 0, 931)
+    y_blocks = _children(buffer, vector_blocks, 1, 932)
+    x_blocks = _children(buffer, vector_blocks, 2, 932)
+
+    # 152: 12 bytes, description, 8 bytes, title
+    description_length = buffer[title_blocks + 24].astype(np.int64)
+    _, titles = gather_strings(buffer, title_blocks + 24 + 1 + description_length + 8)
+
+    # 931: the timestamp are the last 8 bytes of the block.
+    time_sizes = gather(buffer, time_blocks, BLOCK_HEADER)["size"].astype(np.int64)
+    filetimes = gather(buffer, time_blocks + 12 + time_sizes - 8, "<i8")
+
+    y_label, y_label_short, y_count, y_offset = _decode_vectors(buffer, y_blocks)
+    x_label, x_label_short, x_count, x_offset = _decode_vectors(buffer, x_blocks)
+
+    result = np.empty(len(offsets), dtype=[
+        ("offset", "<i8"),
+        ("title", titles.dtype),
+        ("time", "datetime64[ns]"),
+        ("y_label", y_label.dtype),
+        ("y_label_short", y_label_short.dtype),
+        ("y_count", "<i4"),
+        ("y_offset", "<i8"),
+        ("x_label", x_label.dtype),
+        ("x_label_short", x_label_short.dtype),
+        ("x_count", "<i4"),
+        ("x_offset", "<i8"),
+    ])
+
+    result["offset"] = offsets
+    result["title"] = titles
+    result["time"] = filetime_to_datetime64(filetimes)
+    result["y_label"] = y_label
+    result["y_label_short"] = y_label_short
+    result["y_count"] = y_count
+    result["y_offset"] = y_offset
+    result["x_label"] = x_label
+    result["x_label_short"] = x_label_short
+    result["x_count"] = x_count
+    result["x_offset"] = x_offset
+
+    return result
+
+
+def read_vectors(content: Union[bytes, bytearray, memoryview], measurements: np.ndarray, axis: str = "y"
+                 ) -> Union[np.ndarray, List[np.ndarray]]:
+    """
+    Reads the x or y values of measurements decoded with decode_measurements.
+
+    :param content: Content of the tbwk file the measurements were decoded from
+    :param measurements: Result of decode_measurements, or a selection of its rows
+    :param axis: "x" or "y"
+    :return: A (n_measurements, n_points) array if all vectors have the same length, otherwise a list of arrays.
+        If the vectors are evenly spaced within the file, or of different lengths, the arrays are read-only views
+        of content.
+    """
+    if axis not in ("x", "y"):
+        raise ValueError(f"Unknown axis {axis}.")
+
+    counts = measurements[f"{axis}_count"]
+    offsets = measurements[f"{axis}_offset"]
+
+    if len(counts) > 0 and np.all(counts == counts[0]):
+        count = int(counts[0])
+        offsets = offsets.astype(np.int64)
+        steps = np.diff(offsets)
+
+        # Measurements written one after another have evenly spaced vectors, which can be read as a strided view.
+        if len(steps) == 0 or (steps[0] > 0 and np.all(steps == steps[0])):
+            step = int(steps[0]) if len(steps) > 0 else count * 8
+            return np.ndarray((len(offsets), count), dtype="<f8", buffer=content, offset=int(offsets[0]),
+                              strides=(step, 8))
+
+        return np.stack([np.frombuffer(content, dtype="<f8", count=count, offset=int(offset)) for offset in offsets])
+
+    return [np.frombuffer(content, dtype="<f8", count=int(count), offset=int(offset))
+            for count, offset in zip(counts, offsets)]
+
+
+def scan_measurements(filename: Union[str, io.BytesIO, bytes]) -> np.ndarray:
+    """
+    Decodes the measurement headers of a tbwk file in bulk, see decode_measurements.
+
+    :param filename: Path, BytesIO or raw bytes of a tbwk file
+    :return:
+    """
+    return decode_measurements(read_content(filename))
@@ -0,0 +1,203 @@
+import os
+import sys
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Callable, Dict, Tuple
+
+from tbwk.Measurement import Measurement
+from tbwk.Worksheet import Worksheet, import_worksheet
+
+
+# Rough per-object overhead for a parsed property (Property, Value and their strings).
+PROPERTY_FOOTPRINT = 512
+
+
+def estimate_measurement_size(measurement: Measurement) -> int:
+    """ Returns an approximate memory footprint of a measurement in bytes.
+
+    Counts the spectrum arrays and cached previews exactly and the tabled properties with a fixed estimate per
+    property.
+    """
+    size = sys.getsizeof(measurement)
+
+    for values in (measurement.x_values, measurement.y_values):
+        if values is not None:
+            size += values.nbytes
+
+    for label in (measurement.title, measurement.x_label, measurement.y_label):
+        if label is not None:
+            size += sys.getsizeof(label)
+
+    if measurement.properties is not None:
+        size += len(measurement.properties) * PROPERTY_FOOTPRINT
+
+    for x_values, y_values in measurement.iter_previews():
+        size += x_values.nbytes + y_values.nbytes
+
+    return size
+
+
+def estimate_worksheet_size(worksheet: Worksheet) -> int:
+    """ Returns an approximate memory footprint of a worksheet in bytes. """
+    return sys.getsizeof(worksheet) + sum(estimate_measurement_size(m) for m in worksheet)
+
+
+class WorksheetCache:
+    """
+    A thread-safe, size-bounded LRU cache in front of import_worksheet.
+
+    Entries are keyed by the absolute path together with the file size and modification time, so a changed
+    file is parsed again. Eviction is based on the approximate byte footprint of the cached worksheets.
+    Concurrent requests for the same uncached file wait for a single parse instead of parsing it twice.
+
+    Cached worksheets are shared between callers and must be treated as read-only, except for generating
+    previews: previews cached on a measurement of a cached worksheet are added to the footprint of its entry.
+    """
+    _entries: "OrderedDict[Tuple[str, int, int], Tuple[Worksheet, int]]"
+    _pending: Dict[Tuple[str, int, int], Future]
+
+    def __init__(self, max_bytes: int = 256 * 1024 * 1024, loader: Callable[[str], Worksheet] = import_worksheet):
+        """
+
+        :param max_bytes: Upper bound for the summed approximate footprint of all cached worksheets
+        :param loader: Function used to parse a worksheet from a path
+        """
+        self.max_bytes = max_bytes
+        self._loader = loader
+
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._pending = {}
+        self._size = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        """ Returns the number of cached worksheets. """
+        return len(self._entries)
+
+    def __repr__(self) -> str:
+        return f"<WorksheetCache: n={len(self._entries)}, size={self._size}/{self.max_bytes}>"
+
+    @staticmethod
+    def _key(filename: str) -> Tuple[str, int, int]:
+        stat = os.stat(filename)
+        return os.path.abspath(filename), stat.st_size, stat.st_mtime_ns
+
+    def get(self, filename: str) -> Worksheet:
+        """
+        Returns the parsed worksheet for the given path, parsing it only if it is not cached.
+
+        :param filename: Path to a tbwk file
+        :return:
+        """
+        key = self._key(filename)
+
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+
+            self.misses += 1
+            future = self._pending.get(key)
+
+            if future is None:
+                future = Future()
+                self._pending[key] = future
+                owner = True
+            else:
+                owner = False
+
+        if not owner:
+            return future.result()
+
+        try:
+            worksheet = self._loader(filename)
+
+            with self._lock:
+                del self._pending[key]
+                self._store(key, worksheet)
+        except BaseException as e:
+            with self._lock:
+                self._pending.pop(key, None)
+            future.set_exception(e)
+            raise
+
+        future.set_result(worksheet)
+
+        return worksheet
+
+    def _store(self, key: Tuple[str, int, int], worksheet: Worksheet) -> None:
+        """ Adds an entry and evicts least recently used ones. Must be called with the lock held. """
+        size = estimate_worksheet_size(worksheet)
+
+        if size > self.max_bytes:
+            return
+
+        # Drop outdated versions of the same file.
+        for old_key in [k for k in self._entries if k[0] == key[0]]:
+            self._remove(old_key)
+
+        self._entries[key] = (worksheet, size)
+        self._size += size
+
+        def listener(added: int) -> None:
+            self._grow(key, added)
+
+        for measurement in worksheet:
+            measurement.set_preview_listener(listener)
+
+        self._evict()
+
+    def _remove(self, key: Tuple[str, int, int]) -> None:
+        """ Removes an entry and detaches it from the cache. Must be called with the lock held. """
+        worksheet, size = self._entries.pop(key)
+        self._size -= size
+
+        for measurement in worksheet:
+            measurement.set_preview_listener(None)
+
+    def _evict(self) -> None:
+        """ Evicts least recently used entries until the size limit is met. Must be called with the lock held. """
+        while self._size > self.max_bytes and self._entries:
+            self._remove(next(iter(self._entries)))
+            self.evictions += 1
+
+    def _grow(self, key: Tuple[str, int, int], added: int) -> None:
+        """ Accounts for bytes added to a cached worksheet after it was stored, e.g. by previews. """
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is None:
+                return
+
+            self._entries[key] = (entry[0], entry[1] + added)
+            self._size += added
+            self._evict()
+
+    def clear(self) -> None:
+        """ Removes all cached worksheets. Counters are kept. """
+        with self._lock:
+            for key in list(self._entries):
+                self._remove(key)
+
+    def get_size(self) -> int:
+        """ Returns the summed approximate footprint of all cached worksheets in bytes. """
+        return self._size
+
+    def get_stats(self) -> Dict[str, int]:
+        """ Returns hit, miss and eviction counters together with the current number of entries and size. """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "size": self._size,
+            }
@@ -0,0 +1,100 @@
+import io
+from typing import Dict, Iterable, List, Set, Tuple, Union
+
+from tbwk.RawOpener import hash_measurements
+from tbwk.Worksheet import Worksheet, import_worksheet, read_content
+
+
+"""
+Detection of duplicate measurements across worksheets.
+
+The same run is often saved into several worksheets. Measurements are identified by the content hash of their
+raw block (spectrum and measurement time, see tbwk.RawOpener.hash_measurement), which is computed from the
+block headers without decoding the file.
+"""
+
+
+Source = Union[str, io.BytesIO, bytes]
+
+
+def scan_hashes(filename: Source) -> List[bytes]:
+    """
+    Returns the content hashes of all measurements within a worksheet file, in order.
+
+    :param filename: Path, BytesIO or raw bytes of a tbwk file
+    :return:
+    """
+    return hash_measurements(read_content(filename))
+
+
+def find_duplicates(filenames: Iterable[Source]) -> Dict[bytes, List[Tuple[Source, int]]]:
+    """
+    Finds measurements that occur more than once within the given files.
+
+    :param filenames: Paths, BytesIO or raw bytes of tbwk files
+    :return: A dictionary mapping the content hash of each duplicated measurement to all of its occurrences as
+        (filename, measurement index) tuples.
+    """
+    occurrences = {}
+
+    for filename in filenames:
+        for index, content_hash in enumerate(scan_hashes(filename)):
+            occurrences.setdefault(content_hash, []).append((filename, index))
+
+    return {content_hash: found for content_hash, found in occurrences.items() if len(found) > 1}
+
+
+class DuplicateFilter:
+    """
+    Keeps track of already seen measurements while importing or exporting many worksheets.
+
+    Measurements that were seen before are skipped on import without being decoded.
+    """
+    seen: Set[bytes]
+
+    def __init__(self, seen: Iterable[bytes] = ()):
+        """
+
+        :param seen: Content hashes of measurements that are already known, e.g. from an existing archive
+        """
+        self.seen = set(seen)
+
+    def __len__(self) -> int:
+        """ Returns the number of seen measurements. """
+        return len(self.seen)
+
+    def __contains__(self, content_hash: bytes) -> bool:
+        return content_hash in self.seen
+
+    def import_worksheet(self, filename: Source) -> Worksheet:
+        """
+        Imports a worksheet containing only measurements that were not seen before, and marks them as seen.
+
+        Duplicates within the same file are kept, as they are separate entries in the worksheet.
+
+        :param filename: Path, BytesIO or raw bytes of a tbwk file
+        :return:
+        """
+        worksheet = import_worksheet(filename, skip_hashes=self.seen)
+        self.seen.update(measurement.get_content_hash() for measurement in worksheet)
+
+        return worksheet
+
+    def filter(self, worksheet: Worksheet) -> Worksheet:
+        """
+        Returns a new worksheet with only the measurements that were not seen before, and marks them as seen.
+
+        Measurements without a content hash (not read from a file) are always kept.
+
+        :param worksheet: A worksheet, e.g. before exporting it
+        :return:
+        """
+        filtered = Worksheet()
+
+        for measurement in worksheet:
+            if measurement.get_content_hash() not in self.seen:
+                filtered.add_measurement(measurement)
+
+        self.seen.update(m.get_content_hash() for m in filtered if m.get_content_hash() is not None)
+
+        return filtered
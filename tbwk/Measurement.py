@@ -1,8 +1,10 @@
 import numpy as np
-from scipy.interpolate import interp1d
 from datetime import datetime
 
-from tbwk.RawOpener import Block
+from typing import Callable, Dict, Iterator, Optional, Tuple
+
+from tbwk.Preview import downsample
+from tbwk.RawOpener import Block, hash_measurement
 from tbwk.Properties import PropertyBag
 
 
@@ -93,6 +95,11 @@ class Measurement:
 
     properties: PropertyBag = None
 
+    content_hash: Optional[bytes] = None
+
+    _previews: Dict[Tuple[int, str], Tuple[np.ndarray, np.ndarray]] = None
+    _preview_listener: Optional[Callable[[int], None]] = None
+
     def __init__(self,
                  title: str,
                  x_values: np.ndarray,
@@ -101,6 +108,7 @@ class Measurement:
                  y_label: str,
                  time: datetime,
                  properties: PropertyBag = None,
+                 content_hash: Optional[bytes] = None,
                  ):
         """
 
@@ -110,6 +118,7 @@ class Measurement:
         :param y_values: numpy array containing y values (must be equal size)
         :param y_label: label for y values
         :param properties: A property bag
+        :param content_hash: Hash of the raw measurement block, see tbwk.RawOpener.hash_measurement
         """
         assert len(x_values) == len(y_values)
 
@@ -125,6 +134,17 @@ class Measurement:
 
         self.properties = properties
 
+        self.content_hash = content_hash
+
+        self._previews = {}
+        self._preview_listener = None
+
+    def __getstate__(self) -> dict:
+        # The preview listener belongs to the cache holding this measurement and is not copied.
+        state = self.__dict__.copy()
+        state["_preview_listener"] = None
+        return state
+
     def __repr__(self) -> str:
         return f"<Measurement[{self.title}], {self.properties.get_method_title()}>"
 
@@ -187,6 +207,65 @@ class Measurement:
         """
         return self.properties
 
+    def get_content_hash(self) -> Optional[bytes]:
+        """
+        Returns the hash of the raw spectrum and measurement time, if the measurement was read from a file.
+
+        Identical measurements saved into different worksheets share the same hash.
+        """
+        return self.content_hash
+
+    def get_preview(self, n_points: int = 100, method: str = "lttb") -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Returns a downsampled copy of the spectrum for plotting, see tbwk.Preview.
+
+        Previews are cached on the measurement.
+
+        :param n_points: Target number of points
+        :param method: "minmax" or "lttb"
+        :return: x and y values of the preview
+        """
+        if not self.has_preview(n_points, method):
+            x_values, y_values = downsample(self.x_values, self.y_values, n_points, method)
+            self.set_preview(n_points, method, x_values, y_values)
+
+        return self._previews[(n_points, method)]
+
+    def set_preview(self, n_points: int, method: str, x_values: np.ndarray, y_values: np.ndarray) -> None:
+        """
+        Stores a precomputed preview, e.g. from Worksheet.get_previews.
+        """
+        key = (n_points, method)
+        added = x_values.nbytes + y_values.nbytes
+
+        if key in self._previews:
+            added -= sum(values.nbytes for values in self._previews[key])
+
+        self._previews[key] = (x_values, y_values)
+
+        if self._preview_listener is not None and added != 0:
+            self._preview_listener(added)
+
+    def has_preview(self, n_points: int, method: str) -> bool:
+        """
+        Returns True if a preview with the given number of points and method is cached.
+        """
+        return (n_points, method) in self._previews
+
+    def iter_previews(self) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+        """
+        Iterates over the x and y values of all cached previews.
+        """
+        for preview in self._previews.values():
+            yield preview
+
+    def set_preview_listener(self, listener: Optional[Callable[[int], None]]) -> None:
+        """
+        Sets a callable that receives the number of bytes added whenever a preview is cached, e.g. to account
+        for the previews of a cached worksheet. Pass None to remove it.
+        """
+        self._preview_listener = listener
+
     def get_absorption_at(self, wavelength: float, from_spectrum=False) -> float:
         """ Returns the absorption at a given wavelength.
 
@@ -207,15 +286,27 @@ class Measurement:
         if len(result) == 1:
             return result.item()
 
-        # If this does not work, we need to intrapolate
+        # If this does not work, we need to intrapolate. scipy is only imported here as it is slow to load.
+        from scipy.interpolate import interp1d
+
         f = interp1d(self.x_values, self.y_values, kind="cubic")
 
         return f(wavelength)
 
     @classmethod
-    def from_block(cls, block):
+    def from_block(cls, block, content_hash: Optional[bytes] = None):
+        """
+        Creates a measurement from a parsed measurement (151) block.
+
+        :param block: The measurement block
+        :param content_hash: The result of hash_measurement for the block, if it is already known
+        :return:
+        """
         assert block.type == Block.Measurement
 
+        if content_hash is None:
+            content_hash = hash_measurement(block.content)
+
         # Create a property bag
         properties = PropertyBag.from_xml(block.parsed_content[2].parsed_content)
 
@@ -228,6 +319,7 @@ class Measurement:
             y_label=block.parsed_content[1].parsed_content[2].parsed_content[1].parsed_content[0].decode("utf8"),
             time=block.parsed_content[1].parsed_content[2].parsed_content[0].parsed_content[3],
             properties=properties,
+            content_hash=content_hash,
         )
 
         return ret
@@ -0,0 +1,99 @@
+import mmap
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Collection, List, Optional, Tuple
+
+from tbwk.Measurement import Measurement
+from tbwk.RawOpener import Block, iter_block_headers, hash_measurement
+
+
+"""
+Parallel decoding of the measurements within a single worksheet file.
+
+The parent process only walks the top-level block headers to collect the offsets of all measurement (151)
+blocks. These are split into contiguous ranges of roughly equal size, and each worker process maps the file
+into memory and decodes its range. Only offsets are sent to the workers, and the decoded measurements are
+reassembled in file order.
+"""
+
+
+def _decode_range(filename: str, blocks: List[Tuple[int, int]], skip_hashes: Optional[Collection[bytes]]
+                  ) -> List[Measurement]:
+    measurements = []
+
+    with open(filename, "rb") as fh, mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as content:
+        for offset, block_size in blocks:
+            block_content = content[offset + 12:offset + 12 + block_size]
+
+            content_hash = hash_measurement(block_content) if skip_hashes else None
+
+            if content_hash is not None and content_hash in skip_hashes:
+                continue
+
+            block = Block(content[offset:offset + 12], Block.Measurement, block_size, block_content, offset)
+            measurements.append(Measurement.from_block(block, content_hash))
+
+    return measurements
+
+
+def split_ranges(blocks: List[Tuple[int, int]], n: int) -> List[List[Tuple[int, int]]]:
+    """
+    Splits a list of (offset, size) blocks into at most n contiguous ranges of roughly equal byte size.
+
+    :param blocks: Blocks in file order
+    :param n: Maximum number of ranges
+    :return:
+    """
+    total = sum(size for offset, size in blocks)
+    target = total / max(n, 1)
+
+    ranges = []
+    current = []
+    current_size = 0
+
+    for block in blocks:
+        current.append(block)
+        current_size += block[1]
+
+        if current_size >= target and len(ranges) < n - 1:
+            ranges.append(current)
+            current = []
+            current_size = 0
+
+    if current:
+        ranges.append(current)
+
+    return ranges
+
+
+def decode_measurements(filename: str,
+                        processes: Optional[int] = None,
+                        skip_hashes: Optional[Collection[bytes]] = None,
+                        ) -> List[Measurement]:
+    """
+    Decodes all measurements of a worksheet file with a pool of worker processes.
+
+    :param filename: Path to a tbwk file
+    :param processes: Number of worker processes, defaults to the number of CPUs
+    :param skip_hashes: Content hashes of measurements that should not be decoded
+    :return: Measurements in file order
+    """
+    if processes is None:
+        processes = os.cpu_count() or 1
+
+    with open(filename, "rb") as fh, mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as content:
+        blocks = [
+            (offset, block_size)
+            for block_type, block_size, offset in iter_block_headers(content)
+            if block_type == Block.Measurement
+        ]
+
+    ranges = split_ranges(blocks, processes)
+
+    if len(ranges) <= 1:
+        return _decode_range(filename, blocks, skip_hashes)
+
+    with ProcessPoolExecutor(max_workers=len(ranges)) as executor:
+        futures = [executor.submit(_decode_range, filename, block_range, skip_hashes) for block_range in ranges]
+
+        return [measurement for future in futures for measurement in future.result()]
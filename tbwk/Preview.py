@@ -0,0 +1,152 @@
+import numpy as np
+from typing import Tuple
+
+
+"""
+Shape-preserving downsampling of spectra for previews.
+
+Both methods work on a stack of spectra sharing one x axis, with shape (n_spectra, n_points), and select
+points of the original spectra, so peaks and edges stay visible in the preview.
+
+    - minmax: Splits the spectrum into equally sized buckets and keeps the minimum and maximum of each bucket.
+    - lttb: Largest-Triangle-Three-Buckets. Keeps the first and last point and from each bucket in between the
+      point spanning the largest triangle with the previously selected point and the average of the next
+      bucket.
+"""
+
+
+METHODS = ("minmax", "lttb")
+
+
+def downsample(x_values: np.ndarray, y_values: np.ndarray, n_points: int, method: str = "lttb"
+               ) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Downsamples a stack of spectra sharing one x axis to about n_points points each.
+
+    :param x_values: x values of shape (n,)
+    :param y_values: y values of shape (n,) or (n_spectra, n)
+    :param n_points: Target number of points. Spectra with fewer points are returned unchanged.
+    :param method: "minmax" or "lttb"
+    :return: x and y values of the selected points, each of shape (n_spectra, m) or (m,) for a single spectrum
+    """
+    if method not in METHODS:
+        raise ValueError(f"Unknown downsampling method {method}.")
+
+    x_values = np.asarray(x_values)
+    y_values = np.asarray(y_values)
+    single = y_values.ndim == 1
+    y_values = np.atleast_2d(y_values)
+
+    n = y_values.shape[1]
+
+    if n_points >= n or n < 3:
+        indices = np.broadcast_to(np.arange(n), y_values.shape)
+    elif method == "minmax":
+        indices = minmax_indices(y_values, n_points)
+    else:
+        indices = lttb_indices(x_values, y_values, n_points)
+
+    x_selected = x_values[indices]
+    y_selected = np.take_along_axis(y_values, indices, axis=1)
+
+    if single:
+        return x_selected[0], y_selected[0]
+
+    return x_selected, y_selected
+
+
+def minmax_indices(y_values: np.ndarray, n_points: int) -> np.ndarray:
+    """
+    Returns the indices of the minimum and maximum of each bucket, in x order.
+
+    If minimum and maximum of a bucket are the same point, e.g. in a flat part of the spectrum, the last (or
+    first) point of the bucket is selected as well, so no point is selected twice. A last bucket containing
+    a single point contributes that point only.
+
+    :param y_values: y values of shape (n_spectra, n)
+    :param n_points: Target number of points, two per bucket
+    :return: Indices of shape (n_spectra, 2 * n_buckets) or (n_spectra, 2 * n_buckets - 1)
+    """
+    n_spectra, n = y_values.shape
+    bucket_size = int(np.ceil(n / max(n_points // 2, 1)))
+    n_buckets = int(np.ceil(n / bucket_size))
+
+    # Pad the last bucket with nan, which is ignored by nanargmin and nanargmax.
+    padded = np.full((n_spectra, n_buckets * bucket_size), np.nan)
+    padded[:, :n] = y_values
+    buckets = padded.reshape(n_spectra, n_buckets, bucket_size)
+
+    offsets = np.arange(n_buckets) * bucket_size
+    minima = np.nanargmin(buckets, axis=2) + offsets
+    maxima = np.nanargmax(buckets, axis=2) + offsets
+
+    first = np.minimum(minima, maxima)
+    second = np.maximum(minima, maxima)
+
+    # Pair a single extremum with the last point of its bucket, or the first if it is the last one.
+    last = np.minimum(offsets + bucket_size, n) - 1
+    same = first == second
+    at_last = same & (second == last)
+    second = np.where(same & ~at_last, last, second)
+    first = np.where(at_last, offsets, first)
+
+    indices = np.empty((n_spectra, n_buckets, 2), dtype=np.int64)
+    indices[:, :, 0] = first
+    indices[:, :, 1] = second
+    indices = indices.reshape(n_spectra, 2 * n_buckets)
+
+    if last[-1] == offsets[-1]:
+        return indices[:, :-1]
+
+    return indices
+
+
+def lttb_indices(x_values: np.ndarray, y_values: np.ndarray, n_points: int) -> np.ndarray:
+    """
+    Returns the indices selected by Largest-Triangle-Three-Buckets.
+
+    The loop runs over the buckets; every bucket is processed for all spectra at once.
+
+    :param x_values: x values of shape (n,)
+    :param y_values: y values of shape (n_spectra, n)
+    :param n_points: Target number of points, at least 3
+    :return: Indices of shape (n_spectra, n_points)
+    """
+    n_spectra, n = y_values.shape
+    n_points = max(n_points, 3)
+    rows = np.arange(n_spectra)
+
+    # Bucket boundaries for all points except the first and the last one.
+    edges = np.linspace(1, n - 1, n_points - 1).astype(np.int64)
+
+    indices = np.empty((n_spectra, n_points), dtype=np.int64)
+    indices[:, 0] = 0
+    indices[:, -1] = n - 1
+
+    for bucket in range(n_points - 2):
+        start, stop = edges[bucket], edges[bucket + 1]
+
+        if bucket + 2 < len(edges):
+            next_start, next_stop = edges[bucket + 1], edges[bucket + 2]
+            next_x = x_values[next_start:next_stop].mean()
+            next_y = y_values[:, next_start:next_stop].mean(axis=1)
+        else:
+            next_x = x_values[-1]
+            next_y = y_values[:, -1]
+
+        previous = indices[:, bucket]
+        previous_x = x_values[previous]
+        previous_y = y_values[rows, previous]
+
+        candidates_x = x_values[start:stop]
+        candidates_y = y_values[:, start:stop]
+
+        # Twice the triangle area; the factor does not change the selection.
+        areas = np.abs(
+            (previous_x[:, None] - next_x) * (candidates_y - previous_y[:, None])
+            - (previous_x[:, None] - candidates_x[None, :]) * (next_y[:, None] - previous_y[:, None])
+        )
+
+        indices[:, bucket + 1] = start + np.argmax(areas, axis=1)
+
+    return indices
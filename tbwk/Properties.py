@@ -16,6 +16,14 @@ class PropertyBag:
     def __repr__(self) -> str:
         return f"<PropertyBag: n={len(self._properties)}>"
 
+    def __len__(self) -> int:
+        """ Returns the number of tabled properties. """
+        return len(self._properties)
+
+    def __iter__(self):
+        for property in self._properties.values():
+            yield property
+
     def get_method_title(self) -> str:
         """Returns the method title."""
         return self.method_title
@@ -0,0 +1,245 @@
+import numpy as np
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from tbwk.Measurement import Measurement
+
+
+"""
+Quality control checks for recorded spectra.
+
+All checks work on a stacked (n_measurements, n_wavelengths) array of y values that share the same x axis,
+so a whole worksheet is processed with a handful of vectorized numpy passes. Each check yields a score per
+measurement and a flag that is set if the score crosses the configured threshold.
+
+    - saturation: Maximum absorbance. Flags spectra that exceed the linear range of the instrument.
+    - noise: Robust estimate of the point-to-point noise from the second derivative, relative to the peak
+      absorbance. Flags bubbles and unstable readings.
+    - baseline: Peak-to-peak absorbance within the baseline window (around 340 nm, where the NanoDrop
+      normalizes the spectra). Flags drifting baselines.
+    - negative: Minimum absorbance within the analysis window. Flags spectra recorded against a bad blank.
+    - shape: Cosine distance of the normalized spectrum to the median spectrum of its group. Flags
+      mislabeled or contaminated samples. Spectra below shape_min_absorbance are not scored.
+"""
+
+
+CHECKS = ("saturation", "noise", "baseline", "negative", "shape")
+
+
+def stack_measurements(measurements: Sequence[Measurement]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Stacks the spectra of the given measurements.
+
+    :param measurements: Measurements sharing the same x axis
+    :return: x values of shape (n_wavelengths,) and y values of shape (n_measurements, n_wavelengths)
+    """
+    if len(measurements) == 0:
+        return np.empty(0), np.empty((0, 0))
+
+    x_values = measurements[0].x_values
+
+    for measurement in measurements:
+        if not np.array_equal(measurement.x_values, x_values):
+            raise ValueError(f"Measurement {measurement.title} does not share the x axis of the other measurements.")
+
+    return x_values, np.stack([measurement.y_values for measurement in measurements])
+
+
+class QualityReport:
+    """ Per-measurement scores and flags of a quality control run. """
+    titles: List[str]
+    scores: Dict[str, np.ndarray]
+    flags: Dict[str, np.ndarray]
+
+    def __init__(self, titles: List[str], scores: Dict[str, np.ndarray], flags: Dict[str, np.ndarray]):
+        self.titles = titles
+        self.scores = scores
+        self.flags = flags
+
+    def __len__(self) -> int:
+        """ Returns the number of checked measurements. """
+        return len(self.titles)
+
+    def __repr__(self) -> str:
+        return f"<QualityReport: n={len(self.titles)}, flagged={len(self.get_flagged())}>"
+
+    def get_checks(self) -> List[str]:
+        """ Returns the names of the checks that were run. """
+        return list(self.scores)
+
+    def get_scores(self, check: str) -> np.ndarray:
+        """ Returns the scores of a check, one per measurement. """
+        return self.scores[check]
+
+    def get_flags(self, check: str) -> np.ndarray:
+        """ Returns a boolean array that is true for each measurement failing the check. """
+        return self.flags[check]
+
+    def get_failed(self) -> np.ndarray:
+        """ Returns a boolean array that is true for each measurement failing any check. """
+        failed = np.zeros(len(self.titles), dtype=bool)
+
+        for flags in self.flags.values():
+            failed |= flags
+
+        return failed
+
+    def get_flagged(self) -> List[int]:
+        """ Returns the indices of all measurements failing at least one check. """
+        return np.flatnonzero(self.get_failed()).tolist()
+
+    def get_failed_checks(self, index: int) -> List[str]:
+        """ Returns the names of the checks the measurement at the given index failed. """
+        return [check for check, flags in self.flags.items() if flags[index]]
+
+
+class QualityControl:
+    """
+    A configurable set of spectral quality control checks.
+
+    Thresholds are given in 10 mm absorbance units, as reported by the NanoDrop software.
+    """
+    def __init__(self,
+                 checks: Iterable[str] = CHECKS,
+                 saturation_threshold: float = 100.0,
+                 noise_threshold: float = 0.01,
+                 baseline_window: Tuple[float, float] = (330.0, 350.0),
+                 baseline_threshold: float = 0.5,
+                 analysis_window: Tuple[float, float] = (230.0, 320.0),
+                 negative_threshold: float = -0.05,
+                 shape_threshold: float = 0.05,
+                 shape_min_absorbance: float = 0.5,
+                 ):
+        """
+
+        :param checks: Names of the checks to run
+        :param saturation_threshold: Maximum absorbance that is still considered reliable
+        :param noise_threshold: Maximum noise relative to the peak absorbance (or to 1, if the peak is smaller)
+        :param baseline_window: Wavelength range used for the baseline check
+        :param baseline_threshold: Maximum peak-to-peak absorbance within the baseline window
+        :param analysis_window: Wavelength range used for the negative absorbance check
+        :param negative_threshold: Minimum absorbance within the analysis window
+        :param shape_threshold: Maximum cosine distance to the median spectrum of the group
+        :param shape_min_absorbance: Minimum peak absorbance for a spectrum to take part in the shape check
+        """
+        checks = tuple(checks)
+
+        for check in checks:
+            if check not in CHECKS:
+                raise ValueError(f"Unknown quality control check {check}.")
+
+        self.checks = checks
+        self.saturation_threshold = saturation_threshold
+        self.noise_threshold = noise_threshold
+        self.baseline_window = baseline_window
+        self.baseline_threshold = baseline_threshold
+        self.analysis_window = analysis_window
+        self.negative_threshold = negative_threshold
+        self.shape_threshold = shape_threshold
+        self.shape_min_absorbance = shape_min_absorbance
+
+    def run(self, measurements: Iterable[Measurement], groups: Optional[Sequence] = None) -> QualityReport:
+        """
+        Runs all configured checks over the given measurements (or worksheet).
+
+        :param measurements: Measurements sharing the same x axis
+        :param groups: Optional group label per measurement for the shape check. All measurements form a
+            single group if not given.
+        :return:
+        """
+        measurements = list(measurements)
+        x_values, y_values = stack_measurements(measurements)
+        scores, flags = self.run_stacked(x_values, y_values, groups)
+
+        return QualityReport([measurement.title for measurement in measurements], scores, flags)
+
+    def run_stacked(self,
+                    x_values: np.ndarray,
+                    y_values: np.ndarray,
+                    groups: Optional[Sequence] = None,
+                    ) -> Tuple[Dict[str, np.ndarray], Dict[str, np.ndarray]]:
+        """
+        Runs all configured checks over an already stacked array of spectra.
+
+        :param x_values: x values of shape (n_wavelengths,)
+        :param y_values: y values of shape (n_measurements, n_wavelengths)
+        :param groups: Optional group label per measurement for the shape check
+        :return: Scores and flags per check
+        """
+        scores = {}
+        flags = {}
+
+        n = y_values.shape[0]
+
+        if n == 0:
+            for check in self.checks:
+                scores[check] = np.empty(0)
+                flags[check] = np.empty(0, dtype=bool)
+
+            return scores, flags
+
+        peak = np.max(y_values, axis=1)
+
+        if "saturation" in self.checks:
+            scores["saturation"] = peak
+            flags["saturation"] = peak > self.saturation_threshold
+
+        if "noise" in self.checks:
+            # Median absolute deviation of the second derivative, scaled to a standard deviation of the
+            # point noise (a second difference has sqrt(6) times the noise of a single point).
+            d2 = np.diff(y_values, n=2, axis=1)
+            mad = np.median(np.abs(d2 - np.median(d2, axis=1, keepdims=True)), axis=1)
+            noise = mad * 1.4826 / np.sqrt(6)
+
+            scores["noise"] = noise / np.maximum(np.abs(peak), 1.0)
+            flags["noise"] = scores["noise"] > self.noise_threshold
+
+        if "baseline" in self.checks:
+            window = _window(x_values, self.baseline_window)
+            scores["baseline"] = np.ptp(y_values[:, window], axis=1) if window.any() else np.full(n, np.nan)
+            flags["baseline"] = scores["baseline"] > self.baseline_threshold
+
+        if "negative" in self.checks:
+            window = _window(x_values, self.analysis_window)
+            scores["negative"] = np.min(y_values[:, window], axis=1) if window.any() else np.full(n, np.nan)
+            flags["negative"] = scores["negative"] < self.negative_threshold
+
+        if "shape" in self.checks:
+            scores["shape"] = self._shape_scores(y_values, peak, groups)
+            flags["shape"] = scores["shape"] > self.shape_threshold
+
+        return scores, flags
+
+    def _shape_scores(self, y_values: np.ndarray, peak: np.ndarray, groups: Optional[Sequence]) -> np.ndarray:
+        n = y_values.shape[0]
+        distance = np.full(n, np.nan)
+
+        norms = np.linalg.norm(y_values, axis=1, keepdims=True)
+        normalized = y_values / np.where(norms == 0, 1.0, norms)
+        eligible = peak >= self.shape_min_absorbance
+
+        if groups is None:
+            labels = np.zeros(n, dtype=int)
+        else:
+            if len(groups) != n:
+                raise ValueError("The number of group labels must match the number of measurements.")
+            _, labels = np.unique(np.asarray(groups, dtype=object).astype(str), return_inverse=True)
+
+        for label in np.unique(labels):
+            members = (labels == label) & eligible
+
+            if not members.any():
+                continue
+
+            median = np.median(normalized[members], axis=0)
+            median_norm = np.linalg.norm(median)
+
+            if median_norm == 0:
+                continue
+
+            distance[members] = 1.0 - normalized[members] @ (median / median_norm)
+
+        return distance
+
+
+def _window(x_values: np.ndarray, window: Tuple[float, float]) -> np.ndarray:
+    return (x_values >= window[0]) & (x_values <= window[1])
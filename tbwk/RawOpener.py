@@ -1,15 +1,29 @@
-try:
-    import defusedxml.cElementTree as ET
-except ImportError:
-    try:
-        import defusedxml.ElementTree as ET
-    except ImportError:
-        import xml.etree.ElementTree as ET
-
 import datetime
+import hashlib
 import numpy as np
 
 
+_element_tree = None
+
+
+def get_element_tree():
+    """ Returns the ElementTree module used to parse the XML blocks.
+
+    The backend is chosen and imported on first use, preferring defusedxml over the standard library.
+    """
+    global _element_tree
+
+    if _element_tree is None:
+        try:
+            import defusedxml.ElementTree as ET
+        except ImportError:
+            import xml.etree.ElementTree as ET
+
+        _element_tree = ET
+
+    return _element_tree
+
+
 class Block:
     """ Represents a "Block" in a tbwk file."""
     Measurement = 151
@@ -69,7 +83,7 @@ class Block:
             return self.parsed_content[0].parsed_content[1]
 
     def parse_xml(self):
-        xml = ET.fromstring(self.content[12:])
+        xml = get_element_tree().fromstring(self.content[12:])
 
         self.parsed_content = xml
 
@@ -123,7 +137,7 @@ class Block:
     def parse_991(self):
         stringLength = int.from_bytes(self.content[12:13], "little")
         objectType = self.content[13:13 + stringLength]
-        xml = ET.fromstring(self.content[13 + stringLength:])
+        xml = get_element_tree().fromstring(self.content[13 + stringLength:])
 
         self.parsed_content = (objectType, xml)
 
@@ -171,7 +185,9 @@ def unpack_datetime(filetime_bin):
 
     Windows file time is a 64bit integer noted in "100 ns since January 1, 1601 UTC"
 
-    For conversion, we need to adjust the epoch first and then convert to seconds.
+    For conversion, we need to adjust the epoch first. The remaining 100 ns intervals are split into whole seconds
+    and microseconds with integer arithmetic, so no precision is lost to float rounding (datetime itself only
+    resolves microseconds; use tbwk.BulkDecoder for exact nanosecond timestamps).
 
     Source:
     https://support.microsoft.com/en-za/help/167296/how-to-convert-a-unix-time-t-to-a-win32-filetime-or-systemtime
@@ -181,36 +197,162 @@ def unpack_datetime(filetime_bin):
 
     filetime_int = int.from_bytes(filetime_bin, "little")
 
-    unixtime_in_100ns = filetime_int - 116444736000000000 # Shift the epoch to January 1, 1970 UTC
-    unixtime_in_s = unixtime_in_100ns * 0.000_000_1 # 0.000_000_1 s/100 ns
+    unixtime_in_100ns = filetime_int - 116444736000000000  # Shift the epoch to January 1, 1970 UTC
+    unixtime_in_s, remainder_in_100ns = divmod(unixtime_in_100ns, 10_000_000)
 
-    return datetime.datetime.fromtimestamp(unixtime_in_s)
+    return datetime.datetime.fromtimestamp(unixtime_in_s) + datetime.timedelta(microseconds=remainder_in_100ns // 10)
 
 
-def unpack(content):
-    """ Unpacks a file or subfile and returns the individual blocks."""
+def iter_block_headers(content):
+    """ Iterates over the blocks of a file or subfile without parsing them.
+
+    Yields (block type, block size, offset) for each block. The block content starts at offset + 12.
+    """
     assert content[0:4] == b"\xfe\xff\xff\xff"
 
     header_size = int.from_bytes(content[32:36], "little")
-
-    # Unpack blocks
-    blocks = []
     offset = 40 + header_size
 
     while True:
-        block_head = content[offset:offset + 12]
-
         block_type = int.from_bytes(content[offset:offset + 4], "little")
         block_size = int.from_bytes(content[offset + 4:offset + 8], "little")
-        block_none = int.from_bytes(content[offset + 8:offset + 12], "little")
-
-        block = content[offset + 12:offset + 12 + block_size]
 
-        blocks.append(Block(block_head, block_type, block_size, block, offset))
+        yield block_type, block_size, offset
 
         offset += 12 + block_size
 
         if offset == len(content):
             break
 
-    return blocks
\ No newline at end of file
+
+def find_subblock(content, block_type):
+    """ Returns the content of the first block of the given type within the subfile of a block, or None. """
+    content = content[12:]
+
+    for subblock_type, subblock_size, offset in iter_block_headers(content):
+        if subblock_type == block_type:
+            return content[offset + 12:offset + 12 + subblock_size]
+
+    return None
+
+
+def hash_measurement(content):
+    """ Returns a content hash of a raw measurement (151) block.
+
+    The hash covers the 931 timestamp and the raw 932 blocks (axis labels and values), but not the sample name.
+    Only the block headers are read, nothing is decoded.
+
+    :param content: Content of the 151 block, as in Block.content
+    :return: 16 byte digest
+    :raises ValueError: If the block does not contain the 920 and 930 blocks
+    """
+    content = memoryview(content)
+    digest = hashlib.blake2b(digest_size=16)
+
+    data_wrapper = find_subblock(content, 920)
+    vector_wrapper = find_subblock(data_wrapper, 930) if data_wrapper is not None else None
+
+    if vector_wrapper is None:
+        raise ValueError("Measurement block does not contain a 920 block with a 930 block.")
+
+    vectors = vector_wrapper[12:]
+
+    for block_type, block_size, offset in iter_block_headers(vectors):
+        if block_type == 931:
+            # The timestamp are the last 8 bytes of the block.
+            digest.update(vectors[offset + 12 + block_size - 8:offset + 12 + block_size])
+        elif block_type == 932:
+            digest.update(vectors[offset + 12:offset + 12 + block_size])
+
+    return digest.digest()
+
+
+def hash_measurements(content):
+    """ Returns the content hashes of all measurement blocks within a file, in order. """
+    content = memoryview(content)
+
+    return [
+        hash_measurement(content[offset + 12:offset + 12 + block_size])
+        for block_type, block_size, offset in iter_block_headers(content)
+        if block_type == Block.Measurement
+    ]
+
+
+def read_exactly(stream, size):
+    """ Reads exactly size bytes from a stream, raising EOFError if it ends before. """
+    data = stream.read(size)
+
+    if len(data) == size:
+        return data
+
+    parts = [data]
+    remaining = size - len(data)
+
+    while remaining > 0:
+        part = stream.read(remaining)
+
+        if not part:
+            raise EOFError(f"Stream ended {remaining} bytes before the end of the block.")
+
+        parts.append(part)
+        remaining -= len(part)
+
+    return b"".join(parts)
+
+
+def iter_blocks(stream, skip=None):
+    """ Unpacks a file from a binary stream, yielding one block at a time.
+
+    Only the current block is held in memory, which allows to parse files while they are decompressed.
+
+    :param stream: A binary file-like object positioned at the start of the file
+    :param skip: Optional callable receiving block type and raw block content. Blocks for which it returns
+        True are not parsed and not yielded.
+    """
+    head = read_exactly(stream, 40)
+    assert head[0:4] == b"\xfe\xff\xff\xff"
+
+    header_size = int.from_bytes(head[32:36], "little")
+    read_exactly(stream, header_size)
+
+    offset = 40 + header_size
+
+    while True:
+        block_head = stream.read(12)
+
+        if not block_head:
+            break
+
+        if len(block_head) < 12:
+            block_head += read_exactly(stream, 12 - len(block_head))
+
+        block_type = int.from_bytes(block_head[0:4], "little")
+        block_size = int.from_bytes(block_head[4:8], "little")
+
+        block = read_exactly(stream, block_size)
+
+        if skip is None or not skip(block_type, block):
+            yield Block(block_head, block_type, block_size, block, offset)
+
+        offset += 12 + block_size
+
+
+def unpack(content, skip=None):
+    """ Unpacks a file or subfile and returns the individual blocks.
+
+    :param content: Content of the file or subfile
+    :param skip: Optional callable receiving block type and raw block content. Blocks for which it returns
+        True are not parsed and not returned.
+    """
+    blocks = []
+
+    for block_type, block_size, offset in iter_block_headers(content):
+        block_head = content[offset:offset + 12]
+        block = content[offset + 12:offset + 12 + block_size]
+
+        if skip is not None and skip(block_type, block):
+            continue
+
+        blocks.append(Block(block_head, block_type, block_size, block, offset))
+
+    return blocks
@@ -0,0 +1,227 @@
+import numpy as np
+from typing import Dict, Iterable, Sequence, Tuple, Union
+
+from tbwk.Measurement import Measurement
+
+
+"""
+Batched resampling of spectra onto a common wavelength grid.
+
+Both linear and cubic spline interpolation are linear in the y values. For a given source axis, the
+interpolation can therefore be written as a weight matrix W of shape (n_source, n_target), and resampling
+a stack of spectra is a single matrix product Y @ W. Weight matrices are computed once per distinct source
+axis and shared between all measurements recorded on that axis.
+"""
+
+
+KINDS = ("linear", "cubic")
+
+
+def _sort_axis(source_x: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """ Returns the sort order and the sorted source axis, checking that it can be interpolated. """
+    order = np.argsort(source_x, kind="stable")
+    sorted_x = source_x[order]
+
+    if len(sorted_x) < 2:
+        raise ValueError("At least two source wavelengths are required.")
+
+    if np.any(np.diff(sorted_x) <= 0):
+        raise ValueError("Source wavelengths must not contain duplicates.")
+
+    return order, sorted_x
+
+
+def compute_linear_weights(source_x: np.ndarray, target_x: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Computes the neighbouring source points and their weights for linear interpolation onto target_x.
+
+    The value at each target wavelength is y[left] * (1 - t) + y[right] * t, so every output point only depends
+    on its two neighbours. Target wavelengths outside of the source range point to the first source point with
+    t = 0.
+
+    :param source_x: Source wavelengths without duplicates, in any order
+    :param target_x: Target wavelengths
+    :return: left and right indices into source_x and the weights t, each of shape (len(target_x),)
+    """
+    source_x = np.asarray(source_x, dtype=np.float64)
+    target_x = np.asarray(target_x, dtype=np.float64)
+    order, sorted_x = _sort_axis(source_x)
+
+    right = np.clip(np.searchsorted(sorted_x, target_x, side="right"), 1, len(sorted_x) - 1)
+    left = right - 1
+    t = (target_x - sorted_x[left]) / (sorted_x[right] - sorted_x[left])
+
+    outside = (target_x < sorted_x[0]) | (target_x > sorted_x[-1])
+    left[outside] = 0
+    right[outside] = 0
+    t[outside] = 0.0
+
+    return order[left], order[right], t
+
+
+def compute_weights(source_x: np.ndarray, target_x: np.ndarray, kind: str = "linear") -> np.ndarray:
+    """
+    Computes the interpolation weights mapping values on source_x to target_x.
+
+    :param source_x: Source wavelengths without duplicates, in any order
+    :param target_x: Target wavelengths
+    :param kind: "linear" or "cubic" (not-a-knot cubic spline, as used by Measurement.get_absorption_at)
+    :return: Weight matrix of shape (len(source_x), len(target_x)). Columns of target wavelengths outside of
+        the source range are zero.
+    """
+    if kind not in KINDS:
+        raise ValueError(f"Unknown interpolation kind {kind}.")
+
+    source_x = np.asarray(source_x, dtype=np.float64)
+    target_x = np.asarray(target_x, dtype=np.float64)
+
+    n_source = len(source_x)
+    n_target = len(target_x)
+
+    if kind == "linear":
+        left, right, t = compute_linear_weights(source_x, target_x)
+
+        weights = np.zeros((n_source, n_target))
+        columns = np.arange(n_target)
+        weights[left, columns] = 1.0 - t
+        weights[right, columns] += t
+
+        outside = (target_x < source_x.min()) | (target_x > source_x.max())
+        weights[:, outside] = 0.0
+
+        return weights
+
+    from scipy.interpolate import CubicSpline
+
+    # Work on an increasing axis and permute the rows back at the end.
+    order, sorted_x = _sort_axis(source_x)
+
+    spline = CubicSpline(sorted_x, np.eye(n_source), axis=0, extrapolate=False)
+    weights = spline(target_x).T
+
+    outside = (target_x < sorted_x[0]) | (target_x > sorted_x[-1])
+    weights[:, outside] = 0.0
+
+    result = np.empty_like(weights)
+    result[order] = weights
+
+    return result
+
+
+class Resampler:
+    """
+    Resamples many spectra onto a fixed target grid.
+
+    Weights are cached per distinct source axis, so resampling a large library recorded with only a few
+    instrument settings costs a few vectorized operations. Linear interpolation gathers the two neighbours of
+    each target point, so a non-finite input value only affects its neighbouring intervals. Cubic interpolation
+    is a matrix product with the spline weights; like any cubic spline, it spreads non-finite values over the
+    whole spectrum.
+    """
+    target_x: np.ndarray
+    kind: str
+    fill_value: float
+
+    _weights: Dict[bytes, Union[np.ndarray, Tuple[np.ndarray, np.ndarray, np.ndarray]]]
+
+    def __init__(self, target_x: np.ndarray, kind: str = "linear", fill_value: float = np.nan):
+        """
+
+        :param target_x: Target wavelengths
+        :param kind: "linear" or "cubic"
+        :param fill_value: Value for target wavelengths outside of the source range
+        """
+        if kind not in KINDS:
+            raise ValueError(f"Unknown interpolation kind {kind}.")
+
+        self.target_x = np.asarray(target_x, dtype=np.float64)
+        self.kind = kind
+        self.fill_value = fill_value
+        self._weights = {}
+
+    def __repr__(self) -> str:
+        return f"<Resampler[{self.kind}]: n={len(self.target_x)}, cached axes={len(self._weights)}>"
+
+    def get_weights(self, source_x: np.ndarray) -> Union[np.ndarray, Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+        """
+        Returns the (cached) weights for the given source axis.
+
+        These are the (left, right, t) arrays of compute_linear_weights for linear interpolation, and the weight
+        matrix of compute_weights for cubic interpolation.
+        """
+        source_x = np.ascontiguousarray(source_x, dtype=np.float64)
+        key = source_x.tobytes()
+
+        if key not in self._weights:
+            if self.kind == "linear":
+                self._weights[key] = compute_linear_weights(source_x, self.target_x)
+            else:
+                self._weights[key] = compute_weights(source_x, self.target_x, self.kind)
+
+        return self._weights[key]
+
+    def resample_array(self, source_x: np.ndarray, y_values: np.ndarray) -> np.ndarray:
+        """
+        Resamples spectra sharing a single source axis.
+
+        :param source_x: Source wavelengths of shape (n_source,)
+        :param y_values: y values of shape (n_source,) or (n_spectra, n_source)
+        :return: Resampled values of shape (n_target,) or (n_spectra, n_target)
+        """
+        y_values = np.asarray(y_values, dtype=np.float64)
+        weights = self.get_weights(source_x)
+
+        if self.kind == "linear":
+            left, right, t = weights
+            result = y_values[..., left] * (1.0 - t) + y_values[..., right] * t
+        else:
+            result = y_values @ weights
+
+        source_x = np.asarray(source_x)
+        outside = (self.target_x < source_x.min()) | (self.target_x > source_x.max())
+        result[..., outside] = self.fill_value
+
+        return result
+
+    def resample(self, measurements: Iterable[Measurement]) -> np.ndarray:
+        """
+        Resamples the spectra of the given measurements (or worksheet).
+
+        Measurements are grouped by their x axis and every group is resampled with a single matrix product.
+
+        :param measurements: Measurements to resample
+        :return: Resampled y values of shape (n_measurements, n_target)
+        """
+        measurements = list(measurements)
+        result = np.empty((len(measurements), len(self.target_x)))
+
+        for source_x, indices in group_by_axis(measurements).items():
+            y_values = np.stack([measurements[i].y_values for i in indices])
+            result[indices] = self.resample_array(np.frombuffer(source_x), y_values)
+
+        return result
+
+
+def resample(measurements: Iterable[Measurement], target_x: np.ndarray, kind: str = "linear",
+             fill_value: float = np.nan) -> np.ndarray:
+    """
+    Resamples the spectra of the given measurements onto target_x.
+
+    :param measurements: Measurements to resample
+    :param target_x: Target wavelengths
+    :param kind: "linear" or "cubic"
+    :param fill_value: Value for target wavelengths outside of the source range
+    :return: Resampled y values of shape (n_measurements, n_target)
+    """
+    return Resampler(target_x, kind, fill_value).resample(measurements)
+
+
+def group_by_axis(measurements: Sequence[Measurement]) -> Dict[bytes, list]:
+    """ Groups measurements by their x axis. Returns the raw float64 bytes of each axis with the indices. """
+    groups = {}
+
+    for i, measurement in enumerate(measurements):
+        key = np.ascontiguousarray(measurement.x_values, dtype=np.float64).tobytes()
+        groups.setdefault(key, []).append(i)
+
+    return groups
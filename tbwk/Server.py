@@ -0,0 +1,364 @@
+import hashlib
+import io
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import ThreadingMixIn
+from typing import List, Optional, Tuple
+from urllib.parse import parse_qs, unquote, urlsplit
+
+import numpy as np
+
+from tbwk.Cache import WorksheetCache
+from tbwk.Measurement import Measurement
+from tbwk.Properties import Property, Value
+from tbwk.Worksheet import Worksheet, import_worksheet
+
+
+"""
+A local, read-only HTTP server for the worksheets within a directory.
+
+Parsed worksheets are kept in a WorksheetCache and cold parses run in a pool of worker processes. All responses
+carry an ETag derived from the size and modification time of the file, so clients can revalidate with
+If-None-Match without the worksheet being parsed again.
+
+Routes (all GET):
+    /worksheets                                          List of worksheet files
+    /worksheets/<path>                                   Measurement metadata of a worksheet
+    /worksheets/<path>/properties                        Tabled properties of all measurements
+    /worksheets/<path>/spectra[?format=npy]              Spectra of all measurements
+    /worksheets/<path>/measurements/<i>                  Metadata and properties of a single measurement
+    /worksheets/<path>/measurements/<i>/spectrum[?format=npy]
+
+With format=npy, spectra are returned as a .npy buffer of shape (1 + n, n_points), where the first row contains
+the x values. Worksheet spectra are only available as .npy if all measurements share the same x axis.
+"""
+
+
+EXTENSION = ".twbk"
+
+
+class HTTPError(Exception):
+    """ An error that is reported to the client with the given status code. """
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Returns True if an If-None-Match header matches the given ETag.
+
+    If-None-Match uses the weak comparison, so a W/ prefix is ignored on both sides, and * matches any ETag.
+    """
+    if if_none_match is None:
+        return False
+
+    def opaque(tag: str) -> str:
+        tag = tag.strip()
+        return tag[2:] if tag.startswith("W/") else tag
+
+    tags = [opaque(tag) for tag in if_none_match.split(",")]
+
+    return "*" in tags or opaque(etag) in tags
+
+
+def value_to_dict(value: Optional[Value]) -> Optional[dict]:
+    """ Returns a JSON-serializable representation of a Value. """
+    if value is None:
+        return None
+
+    return {
+        "title": value.get_title(),
+        "value": value.get_value(),
+        "digits": value.get_digits(),
+        "unit": value.get_unit(),
+        "factor": value.get_factor(),
+        "formatted": value.get_formatted_value(),
+    }
+
+
+def property_to_dict(property: Property) -> dict:
+    """ Returns a JSON-serializable representation of a Property. """
+    return {
+        "id": property.get_id(),
+        "type": property.get_type(),
+        "value": value_to_dict(property.get_value()),
+        "raw": value_to_dict(property.get_raw_value()),
+    }
+
+
+def measurement_to_dict(index: int, measurement: Measurement, properties: bool = False) -> dict:
+    """ Returns a JSON-serializable representation of the metadata of a Measurement. """
+    content_hash = measurement.get_content_hash()
+
+    result = {
+        "index": index,
+        "title": measurement.get_title(),
+        "method": measurement.get_method_title(),
+        "time": measurement.get_time().isoformat(),
+        "x_label": measurement.get_x_label(),
+        "y_label": measurement.get_y_label(),
+        "points": len(measurement.get_x()),
+        "hash": content_hash.hex() if content_hash is not None else None,
+    }
+
+    if properties:
+        result["properties"] = [property_to_dict(p) for p in measurement.get_property_bag()]
+
+    return result
+
+
+def spectra_to_npy(x_values: np.ndarray, y_values: List[np.ndarray]) -> bytes:
+    """ Returns x values and spectra as a .npy buffer with the x values in the first row. """
+    buffer = io.BytesIO()
+    np.save(buffer, np.vstack([x_values] + list(y_values)), allow_pickle=False)
+
+    return buffer.getvalue()
+
+
+class WorksheetService:
+    """ Resolves worksheet paths below a root directory and keeps parsed worksheets in memory. """
+    def __init__(self, directory: str, workers: Optional[int] = None, cache_bytes: int = 256 * 1024 * 1024):
+        """
+
+        :param directory: Directory containing the worksheets
+        :param workers: Number of worker processes for cold parses. Defaults to the number of CPUs; 0 parses in
+            the request thread.
+        :param cache_bytes: Upper bound for the approximate footprint of the cached worksheets
+        """
+        self.directory = os.path.realpath(directory)
+
+        if workers == 0:
+            self._executor = None
+            loader = import_worksheet
+        else:
+            self._executor = ProcessPoolExecutor(max_workers=workers)
+            loader = self._parse_in_pool
+
+        self.cache = WorksheetCache(max_bytes=cache_bytes, loader=loader)
+
+    def _parse_in_pool(self, filename: str) -> Worksheet:
+        return self._executor.submit(import_worksheet, filename).result()
+
+    def close(self) -> None:
+        """ Shuts down the worker pool. """
+        if self._executor is not None:
+            self._executor.shutdown()
+
+    def list(self) -> List[Tuple[str, os.stat_result]]:
+        """ Returns all worksheet paths relative to the root directory, with their stat results. """
+        found = []
+
+        for root, directories, files in os.walk(self.directory):
+            directories.sort()
+
+            for name in sorted(files):
+                if name.lower().endswith(EXTENSION):
+                    path = os.path.join(root, name)
+                    found.append((os.path.relpath(path, self.directory).replace(os.sep, "/"), os.stat(path)))
+
+        return found
+
+    def resolve(self, relative_path: str) -> str:
+        """ Returns the absolute path of a worksheet, making sure it lies within the root directory. """
+        path = os.path.realpath(os.path.join(self.directory, relative_path))
+
+        if os.path.commonpath([path, self.directory]) != self.directory or not os.path.isfile(path):
+            raise HTTPError(404, f"Worksheet {relative_path} was not found.")
+
+        return path
+
+
+class WorksheetRequestHandler(BaseHTTPRequestHandler):
+    """ Handles the read-only routes of the worksheet server. """
+    server_version = "tbwk"
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        if not self.server.quiet:
+            super().log_message(format, *args)
+
+    def do_HEAD(self):
+        self.handle_request(send_body=False)
+
+    def do_GET(self):
+        self.handle_request(send_body=True)
+
+    def handle_request(self, send_body: bool) -> None:
+        try:
+            status, headers, body = self.route()
+        except HTTPError as e:
+            status, headers, body = e.status, {}, json.dumps({"error": e.message}).encode("utf8")
+            headers["Content-Type"] = "application/json"
+        except Exception as e:
+            self.log_error("Failed to handle %s: %r", self.path, e)
+            status, headers, body = 500, {}, json.dumps({"error": "Internal server error."}).encode("utf8")
+            headers["Content-Type"] = "application/json"
+
+        self.send_response(status)
+
+        for name, value in headers.items():
+            self.send_header(name, value)
+
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+
+        if send_body:
+            self.wfile.write(body)
+
+    def route(self) -> Tuple[int, dict, bytes]:
+        url = urlsplit(self.path)
+        query = parse_qs(url.query)
+        response_format = query.get("format", ["json"])[0]
+
+        if response_format not in ("json", "npy"):
+            raise HTTPError(400, f"Unknown format {response_format}.")
+
+        parts = [unquote(part) for part in url.path.split("/") if part]
+
+        if not parts or parts[0] != "worksheets":
+            raise HTTPError(404, "Not found.")
+
+        service = self.server.service
+
+        if len(parts) == 1:
+            listing = service.list()
+            etag = hashlib.blake2b(
+                repr([(path, stat.st_size, stat.st_mtime_ns) for path, stat in listing]).encode("utf8"),
+                digest_size=8,
+            ).hexdigest()
+
+            return self.respond(f'"{etag}"', None, lambda: self.json([
+                {"path": path, "size": stat.st_size, "modified": stat.st_mtime} for path, stat in listing
+            ]))
+
+        # The worksheet path may contain slashes and ends with the first component carrying the extension.
+        for end in range(1, len(parts)):
+            if parts[end].lower().endswith(EXTENSION):
+                break
+        else:
+            raise HTTPError(404, "Not found.")
+
+        relative_path = "/".join(parts[1:end + 1])
+        rest = parts[end + 1:]
+
+        filename = service.resolve(relative_path)
+        stat = os.stat(filename)
+        representation = hashlib.blake2b(repr((rest, response_format)).encode("utf8"), digest_size=4).hexdigest()
+        etag = f'"{stat.st_size:x}-{stat.st_mtime_ns:x}-{representation}"'
+
+        def render():
+            return self.render(service.cache.get(filename), rest, response_format)
+
+        return self.respond(etag, stat.st_mtime, render)
+
+    def respond(self, etag: str, modified: Optional[float], render) -> Tuple[int, dict, bytes]:
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+
+        if modified is not None:
+            headers["Last-Modified"] = formatdate(modified, usegmt=True)
+
+        if etag_matches(self.headers.get("If-None-Match"), etag):
+            return 304, headers, b""
+
+        content_type, body = render()
+        headers["Content-Type"] = content_type
+
+        return 200, headers, body
+
+    @staticmethod
+    def json(data) -> Tuple[str, bytes]:
+        return "application/json", json.dumps(data).encode("utf8")
+
+    @staticmethod
+    def npy(data: bytes) -> Tuple[str, bytes]:
+        return "application/octet-stream", data
+
+    def render(self, worksheet: Worksheet, rest: List[str], response_format: str) -> Tuple[str, bytes]:
+        measurements = worksheet.measurements
+
+        if not rest:
+            return self.json({"measurements": [measurement_to_dict(i, m) for i, m in enumerate(measurements)]})
+
+        if rest == ["properties"]:
+            return self.json([
+                {"index": i, "properties": [property_to_dict(p) for p in m.get_property_bag()]}
+                for i, m in enumerate(measurements)
+            ])
+
+        if rest == ["spectra"]:
+            if response_format == "npy":
+                if len(measurements) == 0:
+                    raise HTTPError(404, "The worksheet contains no spectra.")
+
+                x_values = measurements[0].get_x()
+
+                if any(not np.array_equal(m.get_x(), x_values) for m in measurements):
+                    raise HTTPError(409, "The measurements do not share the same x axis.")
+
+                return self.npy(spectra_to_npy(x_values, [m.get_y() for m in measurements]))
+
+            return self.json([
+                {"index": i, "x": m.get_x().tolist(), "y": m.get_y().tolist()} for i, m in enumerate(measurements)
+            ])
+
+        if rest[0] == "measurements" and len(rest) in (2, 3):
+            try:
+                index = int(rest[1])
+            except ValueError:
+                index = -1
+
+            if not 0 <= index < len(measurements):
+                raise HTTPError(404, f"Measurement {rest[1]} was not found.")
+
+            measurement = measurements[index]
+
+            if len(rest) == 2:
+                return self.json(measurement_to_dict(index, measurement, properties=True))
+
+            if rest[2] == "spectrum":
+                if response_format == "npy":
+                    return self.npy(spectra_to_npy(measurement.get_x(), [measurement.get_y()]))
+
+                return self.json({"x": measurement.get_x().tolist(), "y": measurement.get_y().tolist()})
+
+        raise HTTPError(404, "Not found.")
+
+
+class WorksheetServer(ThreadingMixIn, HTTPServer):
+    """ A threaded HTTP server serving the worksheets of a WorksheetService. """
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int], service: WorksheetService, quiet: bool = False):
+        super().__init__(address, WorksheetRequestHandler)
+        self.service = service
+        self.quiet = quiet
+
+    def server_close(self) -> None:
+        super().server_close()
+        self.service.close()
+
+
+def make_server(directory: str,
+                host: str = "127.0.0.1",
+                port: int = 8000,
+                workers: Optional[int] = None,
+                cache_bytes: int = 256 * 1024 * 1024,
+                quiet: bool = False,
+                ) -> WorksheetServer:
+    """
+    Creates a worksheet server. Call serve_forever() on the result to start serving.
+
+    :param directory: Directory containing the worksheets
+    :param host: Interface to bind to
+    :param port: Port to bind to, 0 picks a free port
+    :param workers: Number of worker processes for cold parses, see WorksheetService
+    :param cache_bytes: Upper bound for the approximate footprint of the cached worksheets
+    :param quiet: Suppresses the request log
+    :return:
+    """
+    return WorksheetServer((host, port), WorksheetService(directory, workers, cache_bytes), quiet)
@@ -0,0 +1,239 @@
+import numpy as np
+from typing import Iterable, List, Optional, Sequence, Tuple, Union
+
+from tbwk.Measurement import Measurement
+from tbwk.Resampling import Resampler
+
+
+"""
+Similarity search over a library of spectra.
+
+All spectra are resampled onto the wavelength grid of the index, normalized and stored as rows of a single
+float32 matrix. A query is a matrix product of the (normalized) query spectra with the library, followed by
+a partial sort to find the k nearest neighbours.
+"""
+
+
+METRICS = ("cosine", "euclidean")
+NORMALIZATIONS = ("l2", "max", None)
+
+# Upper bound for the number of elements of the intermediate score matrix of a query.
+MAX_SCORE_ELEMENTS = 2 ** 24
+
+
+class SpectralIndex:
+    """
+    An index of spectra for top-k nearest neighbour queries.
+
+    Spectra can be added incrementally. The index can be saved to and loaded from a single .npz file.
+    """
+    x_values: np.ndarray
+    metric: str
+    normalization: Optional[str]
+
+    _data: np.ndarray
+    _squared_norms: np.ndarray
+    _keys: List[str]
+    _size: int
+
+    def __init__(self,
+                 x_values: np.ndarray,
+                 metric: str = "cosine",
+                 normalization: Optional[str] = "l2",
+                 window: Optional[Tuple[float, float]] = None,
+                 ):
+        """
+
+        :param x_values: Wavelength grid all spectra are resampled onto
+        :param metric: "cosine" (scores are similarities, higher is closer) or "euclidean" (scores are
+            distances, lower is closer)
+        :param normalization: Per-spectrum scaling before comparison: "l2" (unit norm), "max" (unit peak) or None
+        :param window: Optional wavelength range; only the part of the grid within it is compared
+        """
+        if metric not in METRICS:
+            raise ValueError(f"Unknown metric {metric}.")
+
+        if normalization not in NORMALIZATIONS:
+            raise ValueError(f"Unknown normalization {normalization}.")
+
+        x_values = np.asarray(x_values, dtype=np.float64)
+
+        if window is not None:
+            x_values = x_values[(x_values >= window[0]) & (x_values <= window[1])]
+
+        if len(x_values) == 0:
+            raise ValueError("The wavelength grid of the index is empty.")
+
+        self.x_values = x_values
+        self.metric = metric
+        self.normalization = normalization
+
+        self._resampler = Resampler(x_values, fill_value=0.0)
+        self._data = np.empty((0, len(x_values)), dtype=np.float32)
+        self._squared_norms = np.empty(0, dtype=np.float32)
+        self._keys = []
+        self._size = 0
+
+    def __len__(self) -> int:
+        """ Returns the number of spectra in the index. """
+        return self._size
+
+    def __repr__(self) -> str:
+        return f"<SpectralIndex[{self.metric}]: n={self._size}, points={len(self.x_values)}>"
+
+    def get_keys(self) -> List[str]:
+        """ Returns the keys of all spectra in the order they were added. """
+        return list(self._keys)
+
+    def _prepare(self, y_values: np.ndarray) -> np.ndarray:
+        y_values = np.nan_to_num(np.atleast_2d(np.asarray(y_values, dtype=np.float64)))
+
+        if self.normalization == "l2":
+            scale = np.linalg.norm(y_values, axis=1, keepdims=True)
+        elif self.normalization == "max":
+            scale = np.max(np.abs(y_values), axis=1, keepdims=True)
+        else:
+            scale = None
+
+        if scale is not None:
+            y_values = y_values / np.where(scale == 0, 1.0, scale)
+
+        if self.metric == "cosine" and self.normalization != "l2":
+            norms = np.linalg.norm(y_values, axis=1, keepdims=True)
+            y_values = y_values / np.where(norms == 0, 1.0, norms)
+
+        return y_values.astype(np.float32)
+
+    def _resample(self, spectra: Union[Iterable[Measurement], np.ndarray]) -> np.ndarray:
+        if isinstance(spectra, np.ndarray):
+            y_values = np.atleast_2d(spectra)
+
+            if y_values.shape[1] != len(self.x_values):
+                raise ValueError("Spectra given as an array must be sampled on the grid of the index.")
+
+            return y_values
+
+        return self._resampler.resample(spectra)
+
+    def add(self, spectra: Union[Iterable[Measurement], np.ndarray], keys: Optional[Sequence[str]] = None) -> None:
+        """
+        Adds spectra to the index.
+
+        :param spectra: Measurements (or a worksheet), or an array of spectra sampled on the grid of the index
+        :param keys: Optional key per spectrum. Defaults to the measurement titles, or to the row number.
+        """
+        if not isinstance(spectra, np.ndarray):
+            spectra = list(spectra)
+
+            if keys is None:
+                keys = [measurement.title for measurement in spectra]
+
+        rows = self._prepare(self._resample(spectra))
+        n = rows.shape[0]
+
+        if keys is None:
+            keys = [str(i) for i in range(self._size, self._size + n)]
+
+        if len(keys) != n:
+            raise ValueError("The number of keys must match the number of spectra.")
+
+        # Grow the storage geometrically so that many small additions stay cheap.
+        if self._size + n > self._data.shape[0]:
+            capacity = max(self._size + n, 2 * self._data.shape[0], 16)
+
+            data = np.empty((capacity, len(self.x_values)), dtype=np.float32)
+            data[:self._size] = self._data[:self._size]
+            squared_norms = np.empty(capacity, dtype=np.float32)
+            squared_norms[:self._size] = self._squared_norms[:self._size]
+
+            self._data = data
+            self._squared_norms = squared_norms
+
+        self._data[self._size:self._size + n] = rows
+        self._squared_norms[self._size:self._size + n] = np.einsum("ij,ij->i", rows, rows)
+        self._keys.extend(str(key) for key in keys)
+        self._size += n
+
+    def query(self, spectra: Union[Iterable[Measurement], np.ndarray], k: int = 5) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Finds the k nearest spectra in the index for each query spectrum.
+
+        :param spectra: Measurements (or a worksheet), or an array of spectra sampled on the grid of the index
+        :param k: Number of neighbours
+        :return: Indices and scores, both of shape (n_queries, k), ordered from nearest to farthest. Use
+            get_keys() to map the indices to keys.
+        """
+        queries = self._prepare(self._resample(spectra))
+        data = self._data[:self._size]
+        k = min(k, self._size)
+
+        indices = np.empty((queries.shape[0], k), dtype=np.int64)
+        scores = np.empty((queries.shape[0], k), dtype=np.float32)
+
+        if k == 0:
+            return indices, scores
+
+        chunk = max(1, MAX_SCORE_ELEMENTS // max(self._size, 1))
+
+        for start in range(0, queries.shape[0], chunk):
+            block = queries[start:start + chunk]
+            products = block @ data.T
+
+            if self.metric == "cosine":
+                # Negate the similarities so that the nearest spectra come first.
+                distances = -products
+            else:
+                squared_norms = np.einsum("ij,ij->i", block, block)
+                distances = squared_norms[:, None] + self._squared_norms[None, :self._size] - 2 * products
+                np.maximum(distances, 0, out=distances)
+
+            if k < self._size:
+                nearest = np.argpartition(distances, k - 1, axis=1)[:, :k]
+            else:
+                nearest = np.broadcast_to(np.arange(self._size), distances.shape)
+
+            order = np.argsort(np.take_along_axis(distances, nearest, axis=1), axis=1, kind="stable")
+            nearest = np.take_along_axis(nearest, order, axis=1)
+            best = np.take_along_axis(distances, nearest, axis=1)
+
+            indices[start:start + chunk] = nearest
+            scores[start:start + chunk] = -best if self.metric == "cosine" else np.sqrt(best)
+
+        return indices, scores
+
+    def save(self, filename: str) -> None:
+        """
+        Saves the index in .npz format to exactly the given path.
+
+        :param filename: Target path
+        """
+        # Write through a file handle, as np.savez would otherwise append .npz to the path.
+        with open(filename, "wb") as fh:
+            np.savez(
+                fh,
+                x_values=self.x_values,
+                metric=np.array(self.metric),
+                normalization=np.array("" if self.normalization is None else self.normalization),
+                data=self._data[:self._size],
+                keys=np.array(self._keys, dtype=str),
+            )
+
+    @classmethod
+    def load(cls, filename: str) -> "SpectralIndex":
+        """
+        Loads an index saved with save().
+
+        :param filename: Path to the .npz file
+        :return:
+        """
+        with np.load(filename, allow_pickle=False) as stored:
+            normalization = str(stored["normalization"]) or None
+            index = cls(stored["x_values"], str(stored["metric"]), normalization)
+
+            data = stored["data"]
+            index._data = data.copy()
+            index._squared_norms = np.einsum("ij,ij->i", data, data)
+            index._keys = [str(key) for key in stored["keys"]]
+            index._size = data.shape[0]
+
+        return index
@@ -1,7 +1,13 @@
 import io
-from typing import List, Union
-from tbwk.RawOpener import unpack, Block
+from collections import deque
+from typing import BinaryIO, Collection, List, Optional, Tuple, Union
+
+import numpy as np
+
+from tbwk.RawOpener import unpack, iter_blocks, hash_measurement, Block
 from tbwk.Measurement import Measurement
+from tbwk.Preview import downsample
+from tbwk.Resampling import group_by_axis
 import os
 
 
@@ -28,15 +34,37 @@ class Worksheet:
         """
         self.measurements.append(measurement)
 
+    def get_previews(self, n_points: int = 100, method: str = "lttb") -> List[Tuple[np.ndarray, np.ndarray]]:
+        """
+        Returns downsampled spectra of all measurements for plotting, see Measurement.get_preview.
+
+        Measurements sharing the same x axis are downsampled together, and the results are cached on the
+        measurements.
+
+        :param n_points: Target number of points
+        :param method: "minmax" or "lttb"
+        :return: x and y values of the preview of each measurement
+        """
+        missing = [m for m in self.measurements if not m.has_preview(n_points, method)]
+
+        for axis, indices in group_by_axis(missing).items():
+            x_values, y_values = downsample(
+                np.frombuffer(axis), np.stack([missing[i].y_values for i in indices]), n_points, method,
+            )
+
+            for row, i in enumerate(indices):
+                missing[i].set_preview(n_points, method, x_values[row], y_values[row])
+
+        return [measurement.get_preview(n_points, method) for measurement in self.measurements]
 
-def import_worksheet(filename: Union[str, io.BytesIO]) -> Worksheet:
+
+def read_content(filename: Union[str, io.BytesIO, bytes]) -> bytes:
     """
-    imports a given filename and creates a tbwk.Worksheet object.
+    Returns the raw content of a tbwk file given as a path, a BytesIO or raw bytes.
 
     :param filename:
     :return:
     """
-
     if type(filename) == str and os.path.exists(filename):
         with open(filename, "rb") as fh:
             content = fh.read()
@@ -48,8 +76,63 @@ def import_worksheet(filename: Union[str, io.BytesIO]) -> Worksheet:
     if content is None:
         raise FileNotFoundError(f"File {filename} was not found.")
 
+    return content
+
+
+def import_worksheet(filename: Union[str, io.BytesIO, BinaryIO, bytes],
+                     skip_hashes: Optional[Collection[bytes]] = None,
+                     processes: Optional[int] = None,
+                     ) -> Worksheet:
+    """
+    imports a given filename and creates a tbwk.Worksheet object.
+
+    Paths and binary file-like objects (such as members of an archive) are parsed block by block while they are
+    read, without holding a copy of the whole file in memory.
+
+    :param filename: Path, binary file-like object or raw bytes
+    :param skip_hashes: Content hashes of measurements that should not be imported. These measurements are
+        skipped before they get decoded.
+    :param processes: If larger than 1, the measurements of a file given by its path are decoded in parallel by
+        this many worker processes. Other inputs are always decoded in the current process.
+    :return:
+    """
+    if processes is not None and processes > 1 and type(filename) == str and os.path.exists(filename):
+        from tbwk.Parallel import decode_measurements
+
+        worksheet = Worksheet()
+
+        for measurement in decode_measurements(filename, processes, skip_hashes):
+            worksheet.add_measurement(measurement)
+
+        return worksheet
+
+    if type(filename) == str and os.path.exists(filename):
+        with open(filename, "rb") as fh:
+            return import_worksheet(fh, skip_hashes)
+
+    # Hashes computed for skipping are passed on in block order, so each measurement is hashed only once.
+    content_hashes = deque()
+
+    if skip_hashes:
+        def skip(block_type, block_content):
+            if block_type != Block.Measurement:
+                return False
+
+            content_hash = hash_measurement(block_content)
+
+            if content_hash in skip_hashes:
+                return True
+
+            content_hashes.append(content_hash)
+            return False
+    else:
+        skip = None
+
     # Unpack the file
-    blocks = unpack(content)
+    if hasattr(filename, "read"):
+        blocks = iter_blocks(filename, skip=skip)
+    else:
+        blocks = unpack(read_content(filename), skip=skip)
 
     # Start loading the worksheet with found data.
     worksheet = Worksheet()
@@ -58,10 +141,10 @@ def import_worksheet(filename: Union[str, io.BytesIO]) -> Worksheet:
     for block in blocks:
         if block.type == Block.Measurement:
             # Add a measurement block
-            measurement = Measurement.from_block(block)
+            content_hash = content_hashes.popleft() if content_hashes else None
+            measurement = Measurement.from_block(block, content_hash)
 
             worksheet.add_measurement(measurement)
         # ToDo: Import data from other blocks, too.
 
     return worksheet
-
@@ -0,0 +1,54 @@
+import argparse
+import sys
+
+
+def serve(args) -> int:
+    from tbwk.Server import make_server
+
+    server = make_server(
+        args.directory,
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        cache_bytes=args.cache_mb * 1024 * 1024,
+        quiet=args.quiet,
+    )
+
+    host, port = server.server_address[:2]
+    print(f"Serving worksheets from {server.service.directory} on http://{host}:{port}/worksheets")
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+    return 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="tbwk", description="Tools for tbwk files generated by NanoDrop 2000.")
+    commands = parser.add_subparsers(dest="command")
+
+    serve_parser = commands.add_parser("serve", help="Serve the worksheets of a directory over HTTP.")
+    serve_parser.add_argument("directory", nargs="?", default=".", help="Directory containing the worksheets")
+    serve_parser.add_argument("--host", default="127.0.0.1", help="Interface to bind to (default: 127.0.0.1)")
+    serve_parser.add_argument("--port", type=int, default=8000, help="Port to bind to (default: 8000)")
+    serve_parser.add_argument("--workers", type=int, default=None,
+                              help="Worker processes for cold parses (default: number of CPUs, 0 to disable)")
+    serve_parser.add_argument("--cache-mb", type=int, default=256, help="Memory budget of the cache in MB")
+    serve_parser.add_argument("--quiet", action="store_true", help="Do not log requests")
+    serve_parser.set_defaults(handler=serve)
+
+    args = parser.parse_args(argv)
+
+    if args.command is None:
+        parser.print_help()
+        return 1
+
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
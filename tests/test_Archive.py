@@ -0,0 +1,71 @@
+import gzip
+import os
+import shutil
+import tarfile
+import tempfile
+import unittest
+import zipfile
+
+from tbwk.Archive import import_from_archive, iter_archive, list_archive
+
+
+class ArchiveTestCase(unittest.TestCase):
+    filenames = [
+        "examples/nanodrop-dna-measurements-01.twbk",
+        "examples/nanodrop-dna-measurements-02.twbk",
+    ]
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+        self.zip = os.path.join(self.directory, "worksheets.zip")
+        with zipfile.ZipFile(self.zip, "w", zipfile.ZIP_DEFLATED) as archive:
+            for filename in self.filenames:
+                archive.write(filename, "data/" + os.path.basename(filename))
+            archive.writestr("data/readme.txt", "not a worksheet")
+
+        self.tar = os.path.join(self.directory, "worksheets.tar.gz")
+        with tarfile.open(self.tar, "w:gz") as archive:
+            for filename in self.filenames:
+                archive.add(filename, "data/" + os.path.basename(filename))
+
+        self.gzip = os.path.join(self.directory, "nanodrop-dna-measurements-02.twbk.gz")
+        with open(self.filenames[1], "rb") as source, gzip.open(self.gzip, "wb") as target:
+            shutil.copyfileobj(source, target)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_list_archive(self):
+        expected = ["data/nanodrop-dna-measurements-01.twbk", "data/nanodrop-dna-measurements-02.twbk"]
+
+        self.assertEqual(expected, list_archive(self.zip))
+        self.assertEqual(expected, list_archive(self.tar))
+        self.assertEqual(["nanodrop-dna-measurements-02.twbk"], list_archive(self.gzip))
+
+    def test_iter_archive(self):
+        for archive in [self.zip, self.tar]:
+            with self.subTest(archive=archive):
+                worksheets = list(iter_archive(archive))
+
+                self.assertEqual([13, 6], [len(worksheet) for name, worksheet in worksheets])
+
+        self.assertEqual([6], [len(worksheet) for name, worksheet in iter_archive(self.gzip)])
+
+    def test_import_from_archive(self):
+        for archive in [self.zip, self.tar, self.gzip]:
+            with self.subTest(archive=archive):
+                worksheet = import_from_archive(archive, "data/nanodrop-dna-measurements-02.twbk")
+
+                self.assertEqual(["blank", "blank", "CF2", "CF1", "wash", "wash"], [m.title for m in worksheet])
+                self.assertAlmostEqual(7.41706, worksheet.measurements[2].get_absorption_at(260), 4)
+
+    def test_missing_member(self):
+        for archive in [self.zip, self.tar]:
+            with self.subTest(archive=archive):
+                with self.assertRaises(FileNotFoundError):
+                    import_from_archive(archive, "data/missing.twbk")
+
+    def test_unsupported_file(self):
+        with self.assertRaises(ValueError):
+            list_archive("README.md")
@@ -0,0 +1,65 @@
+import unittest
+
+import numpy as np
+
+from tbwk import Worksheet
+from tbwk.BulkDecoder import decode_measurements, read_vectors
+from tbwk.RawOpener import unpack_datetime
+
+
+class BulkDecoderTestCase(unittest.TestCase):
+    filenames = [
+        "examples/nanodrop-dna-measurements-01.twbk",
+        "examples/nanodrop-dna-measurements-02.twbk",
+    ]
+
+    def test_matches_block_parser(self):
+        for filename in self.filenames:
+            with self.subTest(filename=filename):
+                with open(filename, "rb") as fh:
+                    content = fh.read()
+
+                worksheet = Worksheet.import_worksheet(filename)
+                measurements = decode_measurements(content)
+
+                self.assertEqual(len(worksheet), len(measurements))
+                self.assertEqual([m.title for m in worksheet], [t.decode("utf8") for t in measurements["title"]])
+                self.assertEqual({b"10mm Absorbance"}, set(measurements["y_label"]))
+                self.assertEqual({b"Wavelength (nm)"}, set(measurements["x_label"]))
+
+                y_values = read_vectors(content, measurements, "y")
+                x_values = read_vectors(content, measurements, "x")
+
+                for i, measurement in enumerate(worksheet):
+                    np.testing.assert_array_equal(measurement.y_values, y_values[i])
+                    np.testing.assert_array_equal(measurement.x_values, x_values[i])
+
+    def test_read_vectors_of_selections(self):
+        with open(self.filenames[0], "rb") as fh:
+            content = fh.read()
+
+        measurements = decode_measurements(content)
+
+        # Evenly spaced rows are read as a strided view, the others are stacked.
+        for rows in [[4], [4, 5], [4, 5, 6], [6, 4]]:
+            with self.subTest(rows=rows):
+                selection = measurements[rows]
+                y_values = read_vectors(content, selection, "y")
+
+                self.assertEqual((len(rows), 131), y_values.shape)
+
+                for i, measurement in enumerate(selection):
+                    should = np.frombuffer(content, dtype="<f8", count=131, offset=int(measurement["y_offset"]))
+                    np.testing.assert_array_equal(should, y_values[i])
+
+    def test_exact_timestamps(self):
+        with open(self.filenames[0], "rb") as fh:
+            measurements = decode_measurements(fh.read())
+
+        # 97 dc af d7 2c 46 d6 01 = 2020-06-19 11:29:06.5140375 UTC
+        self.assertEqual(np.datetime64("2020-06-19T11:29:06.514037500", "ns"), measurements["time"][0])
+
+    def test_unpack_datetime_keeps_microseconds(self):
+        time = unpack_datetime(bytes.fromhex("97dcafd72c46d601"))
+
+        self.assertEqual(514037, time.microsecond)
@@ -0,0 +1,107 @@
+import threading
+import time
+import unittest
+
+from tbwk.Cache import WorksheetCache, estimate_worksheet_size
+from tbwk.Worksheet import import_worksheet
+
+
+class WorksheetCacheTestCase(unittest.TestCase):
+    filenames = [
+        "examples/nanodrop-dna-measurements-01.twbk",
+        "examples/nanodrop-dna-measurements-02.twbk",
+    ]
+
+    def test_hit_returns_same_worksheet(self):
+        cache = WorksheetCache()
+
+        first = cache.get(self.filenames[0])
+        second = cache.get(self.filenames[0])
+
+        self.assertIs(first, second)
+        self.assertEqual(13, len(first))
+
+        stats = cache.get_stats()
+        self.assertEqual(1, stats["hits"])
+        self.assertEqual(1, stats["misses"])
+        self.assertEqual(1, stats["entries"])
+
+    def test_eviction_by_size(self):
+        size = estimate_worksheet_size(import_worksheet(self.filenames[0]))
+        cache = WorksheetCache(max_bytes=size)
+
+        cache.get(self.filenames[0])
+        cache.get(self.filenames[1])
+
+        stats = cache.get_stats()
+        self.assertEqual(1, stats["evictions"])
+        self.assertEqual(1, stats["entries"])
+        self.assertLessEqual(stats["size"], size)
+
+    def test_concurrent_requests_share_one_parse(self):
+        calls = []
+
+        def loader(filename):
+            calls.append(filename)
+            time.sleep(0.05)
+            return import_worksheet(filename)
+
+        cache = WorksheetCache(loader=loader)
+        results = []
+
+        threads = [threading.Thread(target=lambda: results.append(cache.get(self.filenames[1]))) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(1, len(calls))
+        self.assertEqual(4, len(results))
+        self.assertTrue(all(result is results[0] for result in results))
+
+    def test_previews_count_towards_size(self):
+        cache = WorksheetCache()
+        worksheet = cache.get(self.filenames[0])
+
+        for n_points in range(20, 40):
+            worksheet.get_previews(n_points, "minmax")
+
+        self.assertEqual(estimate_worksheet_size(worksheet), cache.get_size())
+
+    def test_previews_trigger_eviction(self):
+        worksheet = import_worksheet(self.filenames[0])
+        size = estimate_worksheet_size(worksheet)
+        cache = WorksheetCache(max_bytes=2 * size)
+
+        first = cache.get(self.filenames[0])
+        cache.get(self.filenames[1])
+
+        for n_points in range(20, 120):
+            first.get_previews(n_points, "minmax")
+
+        self.assertEqual(1, cache.get_stats()["evictions"])
+        self.assertLessEqual(cache.get_size(), 2 * size)
+
+    def test_failed_store_releases_waiting_threads(self):
+        def loader(filename):
+            time.sleep(0.05)
+            return object()
+
+        cache = WorksheetCache(loader=loader)
+        errors = []
+
+        def get():
+            try:
+                cache.get(self.filenames[0])
+            except TypeError as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=get) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(timeout=5)
+
+        self.assertFalse(any(thread.is_alive() for thread in threads))
+        self.assertEqual(3, len(errors))
+        self.assertEqual(0, len(cache))
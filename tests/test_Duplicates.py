@@ -0,0 +1,63 @@
+import io
+import unittest
+from unittest import mock
+
+from tbwk import Measurement, RawOpener, Worksheet
+from tbwk.Duplicates import DuplicateFilter, find_duplicates, scan_hashes
+
+
+class DuplicatesTestCase(unittest.TestCase):
+    filenames = [
+        "examples/nanodrop-dna-measurements-01.twbk",
+        "examples/nanodrop-dna-measurements-02.twbk",
+    ]
+
+    def test_scanned_hashes_match_imported_measurements(self):
+        for filename in self.filenames:
+            with self.subTest(filename=filename):
+                worksheet = Worksheet.import_worksheet(filename)
+
+                self.assertEqual([m.get_content_hash() for m in worksheet], scan_hashes(filename))
+
+    def test_no_duplicates_within_examples(self):
+        self.assertEqual({}, find_duplicates(self.filenames))
+
+    def test_find_duplicates_across_copies(self):
+        with open(self.filenames[1], "rb") as fh:
+            copy = io.BytesIO(fh.read())
+
+        duplicates = find_duplicates([self.filenames[1], copy])
+
+        self.assertEqual(6, len(duplicates))
+        for occurrences in duplicates.values():
+            self.assertEqual(2, len(occurrences))
+
+    def test_filter_skips_seen_measurements(self):
+        duplicate_filter = DuplicateFilter()
+
+        self.assertEqual(13, len(duplicate_filter.import_worksheet(self.filenames[0])))
+        self.assertEqual(0, len(duplicate_filter.import_worksheet(self.filenames[0])))
+        self.assertEqual(0, len(duplicate_filter.filter(Worksheet.import_worksheet(self.filenames[0]))))
+        self.assertEqual(6, len(duplicate_filter.filter(Worksheet.import_worksheet(self.filenames[1]))))
+        self.assertEqual(19, len(duplicate_filter))
+
+    def test_skipping_hashes_each_measurement_once(self):
+        hashes = scan_hashes(self.filenames[0])
+        hash_measurement = mock.Mock(wraps=RawOpener.hash_measurement)
+
+        with mock.patch.object(Worksheet, "hash_measurement", hash_measurement), \
+                mock.patch.object(Measurement, "hash_measurement", hash_measurement):
+            worksheet = Worksheet.import_worksheet(self.filenames[0], skip_hashes=set(hashes[:3]))
+
+        self.assertEqual(13, hash_measurement.call_count)
+        self.assertEqual(hashes[3:], [m.get_content_hash() for m in worksheet])
+
+        worksheet = Worksheet.import_worksheet(self.filenames[0], skip_hashes=set(hashes[:3]), processes=2)
+        self.assertEqual(hashes[3:], [m.get_content_hash() for m in worksheet])
+
+    def test_hash_of_incomplete_block(self):
+        # A measurement block whose subfile only contains an empty 152 block.
+        subfile = b"\xfe\xff\xff\xff" + bytes(36) + (152).to_bytes(4, "little") + bytes(8)
+
+        with self.assertRaises(ValueError):
+            RawOpener.hash_measurement(bytes(12) + subfile)
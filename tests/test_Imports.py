@@ -0,0 +1,23 @@
+import subprocess
+import sys
+import unittest
+
+
+class LazyImportsTestCase(unittest.TestCase):
+    def test_heavy_dependencies_are_not_imported_eagerly(self):
+        code = "import sys, tbwk.Worksheet; print(sorted(m for m in ('scipy', 'defusedxml') if m in sys.modules))"
+        output = subprocess.check_output([sys.executable, "-c", code], universal_newlines=True)
+
+        self.assertEqual("[]", output.strip())
+
+    def test_interpolation_imports_scipy(self):
+        code = (
+            "import sys\n"
+            "from tbwk import Worksheet\n"
+            "worksheet = Worksheet.import_worksheet('examples/nanodrop-dna-measurements-01.twbk')\n"
+            "worksheet.measurements[2].get_absorption_at(260.5, from_spectrum=True)\n"
+            "print('scipy' in sys.modules)"
+        )
+        output = subprocess.check_output([sys.executable, "-c", code], universal_newlines=True)
+
+        self.assertEqual("True", output.strip())
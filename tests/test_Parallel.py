@@ -0,0 +1,32 @@
+import unittest
+
+from tbwk import Worksheet
+from tbwk.Parallel import split_ranges
+
+
+class ParallelTestCase(unittest.TestCase):
+    filenames = [
+        "examples/nanodrop-dna-measurements-01.twbk",
+        "examples/nanodrop-dna-measurements-02.twbk",
+    ]
+
+    def test_parallel_import_matches_serial_import(self):
+        for filename in self.filenames:
+            with self.subTest(filename=filename):
+                serial = Worksheet.import_worksheet(filename)
+                parallel = Worksheet.import_worksheet(filename, processes=3)
+
+                self.assertEqual([m.title for m in serial], [m.title for m in parallel])
+                self.assertEqual([m.get_content_hash() for m in serial], [m.get_content_hash() for m in parallel])
+                self.assertEqual(
+                    [m.get_absorption_at(260) for m in serial],
+                    [m.get_absorption_at(260) for m in parallel],
+                )
+
+    def test_split_ranges(self):
+        blocks = [(i * 10, 10) for i in range(10)]
+        ranges = split_ranges(blocks, 3)
+
+        self.assertEqual(3, len(ranges))
+        self.assertEqual(blocks, [block for block_range in ranges for block in block_range])
+        self.assertEqual([blocks], split_ranges(blocks, 1))
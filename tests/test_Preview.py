@@ -0,0 +1,66 @@
+import unittest
+
+import numpy as np
+
+from tbwk import Worksheet
+from tbwk.Preview import downsample
+
+
+class PreviewTestCase(unittest.TestCase):
+    def setUp(self):
+        self.worksheet = Worksheet.import_worksheet("examples/nanodrop-dna-measurements-01.twbk")
+
+    def test_lttb_keeps_end_points_and_peak(self):
+        measurement = self.worksheet.measurements[2]
+        x_values, y_values = measurement.get_preview(20)
+
+        self.assertEqual(20, len(x_values))
+        self.assertEqual(measurement.x_values[0], x_values[0])
+        self.assertEqual(measurement.x_values[-1], x_values[-1])
+        self.assertTrue(np.all(np.diff(x_values) > 0))
+        self.assertAlmostEqual(measurement.y_values.max(), y_values.max(), 1)
+
+    def test_minmax_keeps_extrema(self):
+        measurement = self.worksheet.measurements[2]
+        x_values, y_values = downsample(measurement.x_values, measurement.y_values, 20, "minmax")
+
+        self.assertLessEqual(len(x_values), 20)
+        self.assertEqual(measurement.y_values.max(), y_values.max())
+        self.assertEqual(measurement.y_values.min(), y_values.min())
+
+    def test_minmax_selects_each_point_once(self):
+        measurement = self.worksheet.measurements[2]
+        x_values = measurement.x_values
+
+        for n in [len(x_values), len(x_values) - 1, 41]:
+            y_values = np.zeros((2, n))
+            y_values[1] = measurement.y_values[:n]
+            y_values[1, n // 2:] = y_values[1, n // 2]
+
+            with self.subTest(n=n):
+                selected_x, selected_y = downsample(x_values[:n], y_values, 20, "minmax")
+
+                for row in selected_x:
+                    self.assertTrue(np.all(np.diff(row) > 0))
+
+                self.assertEqual(x_values[0], selected_x[0, 0])
+                self.assertEqual(x_values[n - 1], selected_x[0, -1])
+
+    def test_worksheet_previews_match_single_previews(self):
+        for method in ["lttb", "minmax"]:
+            with self.subTest(method=method):
+                previews = self.worksheet.get_previews(30, method)
+
+                for measurement, (x_values, y_values) in zip(self.worksheet, previews):
+                    single = downsample(measurement.x_values, measurement.y_values, 30, method)
+
+                    np.testing.assert_array_equal(single[0], x_values)
+                    np.testing.assert_array_equal(single[1], y_values)
+                    self.assertIs(x_values, measurement.get_preview(30, method)[0])
+
+    def test_short_spectra_are_unchanged(self):
+        measurement = self.worksheet.measurements[0]
+        x_values, y_values = measurement.get_preview(1000)
+
+        np.testing.assert_array_equal(measurement.x_values, x_values)
+        np.testing.assert_array_equal(measurement.y_values, y_values)
@@ -0,0 +1,35 @@
+import unittest
+
+import numpy as np
+
+from tbwk import Worksheet
+from tbwk.QualityControl import QualityControl, stack_measurements
+
+
+class QualityControlTestCase(unittest.TestCase):
+    def setUp(self):
+        self.worksheet = Worksheet.import_worksheet("examples/nanodrop-dna-measurements-01.twbk")
+
+    def test_example_worksheet_passes(self):
+        report = QualityControl().run(self.worksheet)
+
+        self.assertEqual(13, len(report))
+        self.assertEqual([], report.get_flagged())
+
+    def test_stacked_checks_flag_bad_spectra(self):
+        x_values, y_values = stack_measurements(self.worksheet.measurements)
+        y_values = y_values[[2, 3, 4]].copy()
+
+        y_values[0] *= 10  # Saturated
+        y_values[1] += np.random.RandomState(0).normal(0, 1.0, y_values.shape[1])  # Noisy
+        y_values[2, x_values >= 330] += np.linspace(0, 1, np.count_nonzero(x_values >= 330))  # Drifting
+
+        scores, flags = QualityControl().run_stacked(x_values, y_values)
+
+        self.assertEqual([True, False, False], flags["saturation"].tolist())
+        self.assertTrue(flags["noise"][1])
+        self.assertTrue(flags["baseline"][2])
+
+    def test_unknown_check(self):
+        with self.assertRaises(ValueError):
+            QualityControl(checks=["unknown"])
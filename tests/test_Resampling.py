@@ -0,0 +1,53 @@
+import unittest
+
+import numpy as np
+from scipy.interpolate import interp1d
+
+from tbwk import Worksheet
+from tbwk.Resampling import Resampler, resample
+
+
+class ResamplingTestCase(unittest.TestCase):
+    def setUp(self):
+        self.worksheet = Worksheet.import_worksheet("examples/nanodrop-dna-measurements-01.twbk")
+        self.target_x = np.linspace(210.0, 360.0, 301)
+
+    def test_matches_interp1d(self):
+        for kind in ["linear", "cubic"]:
+            with self.subTest(kind=kind):
+                actual = resample(self.worksheet, self.target_x, kind)
+                should = np.stack([
+                    interp1d(m.x_values, m.y_values, kind=kind, bounds_error=False)(self.target_x)
+                    for m in self.worksheet
+                ])
+
+                np.testing.assert_allclose(actual, should, atol=1e-10)
+
+    def test_weights_are_shared(self):
+        resampler = Resampler(self.target_x)
+        resampler.resample(self.worksheet)
+
+        self.assertEqual(1, len(resampler._weights))
+
+    def test_fill_value(self):
+        actual = Resampler(self.target_x, fill_value=0.0).resample(self.worksheet)
+
+        self.assertTrue(np.all(actual[:, self.target_x < 220] == 0.0))
+        self.assertTrue(np.all(actual[:, self.target_x > 350] == 0.0))
+
+    def test_linear_keeps_non_finite_values_local(self):
+        measurement = self.worksheet.measurements[2]
+        y_values = measurement.y_values.copy()
+        y_values[40] = np.nan  # 260 nm
+
+        target_x = np.linspace(221.5, 349.5, 10)
+        actual = Resampler(target_x).resample_array(measurement.x_values, y_values)
+        should = interp1d(measurement.x_values, y_values)(target_x)
+
+        np.testing.assert_array_equal(np.isnan(should), np.isnan(actual))
+        self.assertEqual(0, np.count_nonzero(np.isnan(actual)))
+
+        actual = Resampler([259.5, 260.5, 300.0]).resample_array(measurement.x_values, y_values)
+
+        self.assertTrue(np.all(np.isnan(actual[:2])))
+        self.assertTrue(np.isfinite(actual[2]))
@@ -0,0 +1,84 @@
+import io
+import json
+import threading
+import unittest
+import urllib.error
+import urllib.request
+
+import numpy as np
+
+from tbwk.Server import make_server
+
+
+class WorksheetServerTestCase(unittest.TestCase):
+    def setUp(self):
+        self.server = make_server("examples", port=0, workers=0, quiet=True)
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.start()
+        self.base = "http://127.0.0.1:{}".format(self.server.server_address[1])
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join()
+
+    def get(self, path, headers=None):
+        request = urllib.request.Request(self.base + path, headers=headers or {})
+
+        try:
+            with urllib.request.urlopen(request) as response:
+                return response.status, response.headers, response.read()
+        except urllib.error.HTTPError as e:
+            return e.code, e.headers, e.read()
+
+    def test_list_worksheets(self):
+        status, headers, body = self.get("/worksheets")
+
+        self.assertEqual(200, status)
+        self.assertEqual(
+            ["nanodrop-dna-measurements-01.twbk", "nanodrop-dna-measurements-02.twbk"],
+            [entry["path"] for entry in json.loads(body)],
+        )
+
+    def test_metadata_and_properties(self):
+        status, headers, body = self.get("/worksheets/nanodrop-dna-measurements-02.twbk")
+        measurements = json.loads(body)["measurements"]
+
+        self.assertEqual(["blank", "blank", "CF2", "CF1", "wash", "wash"], [m["title"] for m in measurements])
+
+        status, headers, body = self.get("/worksheets/nanodrop-dna-measurements-02.twbk/measurements/2")
+        properties = {p["id"]: p for p in json.loads(body)["properties"]}
+
+        self.assertAlmostEqual(7.41706, properties["A260"]["value"]["value"], 4)
+
+    def test_spectra_as_npy(self):
+        status, headers, body = self.get("/worksheets/nanodrop-dna-measurements-01.twbk/spectra?format=npy")
+        spectra = np.load(io.BytesIO(body))
+
+        self.assertEqual("application/octet-stream", headers["Content-Type"])
+        self.assertEqual((14, 131), spectra.shape)
+        self.assertEqual(220.0, spectra[0, 0])
+
+    def test_conditional_request(self):
+        path = "/worksheets/nanodrop-dna-measurements-01.twbk/measurements/0/spectrum"
+        status, headers, body = self.get(path)
+
+        self.assertEqual(200, status)
+
+        status, headers, body = self.get(path, {"If-None-Match": headers["ETag"]})
+
+        self.assertEqual(304, status)
+        self.assertEqual(b"", body)
+        self.assertEqual(1, self.server.service.cache.get_stats()["misses"])
+
+        for if_none_match in ["W/" + headers["ETag"], '"other", ' + headers["ETag"], "*"]:
+            with self.subTest(if_none_match=if_none_match):
+                self.assertEqual(304, self.get(path, {"If-None-Match": if_none_match})[0])
+
+        self.assertEqual(200, self.get(path, {"If-None-Match": '"other"'})[0])
+
+    def test_not_found(self):
+        self.assertEqual(404, self.get("/worksheets/../setup.py.twbk")[0])
+        self.assertEqual(404, self.get("/worksheets/missing.twbk")[0])
+        self.assertEqual(404, self.get("/worksheets/nanodrop-dna-measurements-01.twbk/measurements/99")[0])
+        self.assertEqual(404, self.get("/worksheets/nanodrop-dna-measurements-01.twbk/measurements/-1")[0])
@@ -0,0 +1,66 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from tbwk import Worksheet
+from tbwk.Similarity import SpectralIndex
+
+
+class SpectralIndexTestCase(unittest.TestCase):
+    def setUp(self):
+        self.worksheets = [
+            Worksheet.import_worksheet("examples/nanodrop-dna-measurements-01.twbk"),
+            Worksheet.import_worksheet("examples/nanodrop-dna-measurements-02.twbk"),
+        ]
+        self.x_values = np.arange(220.0, 351.0)
+
+    def test_query_finds_itself(self):
+        for metric in ["cosine", "euclidean"]:
+            with self.subTest(metric=metric):
+                index = SpectralIndex(self.x_values, metric=metric)
+                index.add(self.worksheets[0])
+
+                indices, scores = index.query(self.worksheets[0], k=3)
+
+                self.assertEqual((13, 3), indices.shape)
+                self.assertEqual(list(range(13)), indices[:, 0].tolist())
+                np.testing.assert_allclose(scores[:, 0], 1.0 if metric == "cosine" else 0.0, atol=1e-3)
+
+    def test_incremental_addition_and_window(self):
+        index = SpectralIndex(self.x_values, window=(240.0, 300.0))
+        index.add(self.worksheets[0])
+        index.add(self.worksheets[1])
+
+        self.assertEqual(19, len(index))
+        self.assertEqual(61, len(index.x_values))
+
+        indices, scores = index.query([self.worksheets[1].measurements[2]], k=1)
+
+        self.assertEqual("CF2", index.get_keys()[indices[0, 0]])
+
+    def test_save_and_load(self):
+        directory = tempfile.mkdtemp()
+
+        try:
+            index = SpectralIndex(self.x_values, metric="euclidean", normalization="max")
+            index.add(self.worksheets[1])
+
+            filename = os.path.join(directory, "index.npz")
+            index.save(filename)
+            loaded = SpectralIndex.load(filename)
+
+            self.assertEqual(index.get_keys(), loaded.get_keys())
+            self.assertEqual("max", loaded.normalization)
+
+            for a, b in zip(index.query(self.worksheets[0]), loaded.query(self.worksheets[0])):
+                np.testing.assert_array_equal(a, b)
+
+            filename = os.path.join(directory, "library")
+            index.save(filename)
+
+            self.assertEqual(index.get_keys(), SpectralIndex.load(filename).get_keys())
+        finally:
+            shutil.rmtree(directory)